@@ -1,27 +1,44 @@
+from .compiled import CompiledExpr
 from .date import ExpressDate
-from .parse import ExpressDateParser
-from datetime import date
+from .index import ExpressDateIndex
+from .parse import ExpansionLimitError, ExpressDateParser
+from datetime import date, tzinfo
 
-__all__ = ["express", "expr", "ExpressDate", "ExpressDateParser"]
+__all__ = [
+    "express", "expr", "CompiledExpr", "ExpansionLimitError",
+    "ExpressDate", "ExpressDateIndex", "ExpressDateParser"
+]
 
 
-def express(e: date | str) -> ExpressDate:
+def express(e: date | str | CompiledExpr, max_dates: int | None = None,
+            tz: tzinfo | None = None) -> ExpressDate:
     """
     Creates and returns a new ExpressDate object 
     from the provided date or string.
 
-    :param e: A Python date object or a string specifying one or more dates.
+    :param e: A Python date object, a string or a compiled expression
+              specifying one or more dates.
+    :param max_dates: An optional maximum number of dates.
+    :param tz: An optional timezone, used for determining 'today'.
     :return: An ExpressDate instance representing the parsed date(s).
+    :raises ExpansionLimitError: If the expression describes
+                                 more than `max_dates` dates.
     """
-    return ExpressDate(e)
+    return ExpressDate(e, max_dates, tz)
 
 
-def expr(e: date | str) -> ExpressDate:
+def expr(e: date | str | CompiledExpr, max_dates: int | None = None,
+         tz: tzinfo | None = None) -> ExpressDate:
     """
     Creates and returns a new ExpressDate object 
     from the provided date or string.
 
-    :param e: A Python date object or a string specifying one or more dates.
+    :param e: A Python date object, a string or a compiled expression
+              specifying one or more dates.
+    :param max_dates: An optional maximum number of dates.
+    :param tz: An optional timezone, used for determining 'today'.
     :return: An ExpressDate instance representing the parsed date(s).
+    :raises ExpansionLimitError: If the expression describes
+                                 more than `max_dates` dates.
     """
-    return express(e)
+    return express(e, max_dates, tz)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+import asyncio
+from concurrent.futures import Executor
+from datetime import date, tzinfo
+from itertools import islice
+from typing import AsyncIterator, Iterable
+from . import clock
+from .compiled import CompiledExpr
+from .date import ExpressDate
+from .parse import ExpressDateParser
+
+__all__ = ["aexpr", "aparse", "aparse_many", "aiter_dates"]
+
+# Expressions with more dates than this are expanded in an executor.
+THRESHOLD = 10_000
+# The number of dates yielded between two returns to the event loop.
+CHUNK_SIZE = 4_096
+
+
+async def aexpr(
+    expr: date | str | CompiledExpr,
+    tz: tzinfo | None = None,
+    max_dates: int | None = None,
+    threshold: int = THRESHOLD,
+    executor: Executor | None = None,
+) -> ExpressDate:
+    """
+    Creates an ExpressDate without blocking the event loop.
+
+    The expression is parsed in the event loop, which is cheap since the
+    dates are not expanded. If it describes more than `threshold` dates,
+    the tuple of its dates is then built and cached in an executor,
+    so later accesses to `dates` and iteration do not block the event loop.
+
+    :param expr: A Python date object, a string or a compiled expression.
+    :param tz: An optional timezone, used for determining 'today'.
+    :param max_dates: An optional maximum number of dates.
+    :param threshold: The number of dates above which work is offloaded.
+    :param executor: An optional executor sharing memory with the caller,
+                     e.g. a thread pool. Defaults to the loop's executor.
+    :return: A new ExpressDate instance.
+    :raises ValueError: If the expression is invalid.
+    :raises ExpansionLimitError: If the expression describes
+                                 more than `max_dates` dates.
+    """
+    instance = ExpressDate(expr, max_dates, tz)
+    if len(instance) > threshold:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, lambda: instance.dates)
+    return instance
+
+
+async def aparse(
+    expr: str,
+    tz: tzinfo | None = None,
+    max_dates: int | None = None,
+    threshold: int = THRESHOLD,
+    executor: Executor | None = None,
+) -> tuple[date, ...]:
+    """
+    Parse a date expression like `ExpressDateParser.parse`,
+    expanding it in an executor if it describes more than `threshold` dates.
+
+    :param expr: A string representing a date (with optional wildcards)
+                 or a date range.
+    :param tz: An optional timezone, used for determining 'today'.
+    :param max_dates: An optional maximum number of dates to generate.
+    :param threshold: The number of dates above which work is offloaded.
+    :param executor: An optional executor. Defaults to the loop's executor.
+    :return: A tuple of date objects parsed from the expression.
+    :raises ValueError: If the expression is invalid or
+                        the date range is incorrect.
+    :raises ExpansionLimitError: If the expression describes
+                                 more than `max_dates` dates.
+    """
+    # 'today' is resolved here, in the context of the caller.
+    date_set = ExpressDateParser.parse_set(expr, tz)
+    ExpressDateParser.check_limit(expr, date_set, max_dates)
+    if len(date_set) <= threshold:
+        return tuple(date_set)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, tuple, date_set)
+
+
+async def aparse_many(
+    exprs: Iterable[str],
+    tz: tzinfo | None = None,
+    max_dates: int | None = None,
+    concurrency: int = 4,
+    threshold: int = THRESHOLD,
+    executor: Executor | None = None,
+) -> list[tuple[date, ...]]:
+    """
+    Parse many date expressions concurrently, like `ExpressDateParser.parse_many`.
+
+    The clock is read once for the whole batch, and at most `concurrency`
+    large expansions run in the executor at the same time, so a batch
+    cannot monopolize the executor.
+
+    :param exprs: The expressions to parse.
+    :param tz: An optional timezone, used for determining 'today'.
+    :param max_dates: An optional maximum number of dates
+                      to generate per expression.
+    :param concurrency: The maximum number of concurrent expansions.
+    :param threshold: The number of dates above which work is offloaded.
+    :param executor: An optional executor. Defaults to the loop's executor.
+    :return: A list with a tuple of date objects for each expression,
+             in the order of the input.
+    :raises ValueError: If any expression is invalid, any date range is
+                        incorrect, or the concurrency is not positive.
+    :raises ExpansionLimitError: If any expression describes
+                                 more than `max_dates` dates.
+    """
+    if concurrency < 1:
+        raise ValueError("Invalid concurrency.")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(expr: str) -> tuple[date, ...]:
+        async with semaphore:
+            return await aparse(expr, tz, max_dates, threshold, executor)
+
+    # The tasks inherit the pinned 'today' from this context.
+    with clock.frozen(tz=tz):
+        return list(await asyncio.gather(*(run(expr) for expr in exprs)))
+
+
+async def aiter_dates(
+    expr: str | ExpressDate,
+    tz: tzinfo | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> AsyncIterator[date]:
+    """
+    Streams the dates of an expression, returning control to the event
+    loop after every `chunk_size` dates, so even "****-**-**" can be
+    consumed without blocking other tasks.
+
+    :param expr: A date expression or an ExpressDate.
+    :param tz: An optional timezone, used for determining 'today'.
+    :param chunk_size: The number of dates generated between two yields
+                       to the event loop.
+    :return: An asynchronous iterator over the dates in ascending order.
+    :raises ValueError: If the expression is invalid or
+                        the chunk size is not positive.
+    """
+    if chunk_size < 1:
+        raise ValueError("Invalid chunk size.")
+    if isinstance(expr, str):
+        expr = ExpressDate(expr, tz=tz)
+    dates = iter(expr)
+    while chunk := tuple(islice(dates, chunk_size)):
+        for value in chunk:
+            yield value
+        await asyncio.sleep(0)
@@ -0,0 +1,237 @@
+"""
+Reproducible benchmarks for the parser and ExpressDate operations.
+
+Run them with:
+    python -m expressdate.bench [--filter TEXT] [--repeat N] [--profile N]
+
+The results are written as JSON (to stdout, or to --output) so that
+runs of different commits can be compared.
+"""
+from __future__ import annotations
+import argparse
+import cProfile
+import io
+import json
+import platform
+import pstats
+import statistics
+import sys
+import timeit
+from datetime import date, datetime, timezone
+from importlib import metadata
+from typing import Any, Callable, NamedTuple, Sequence
+from .date import ExpressDate
+from .parse import ExpressDateParser
+
+__all__ = ["Case", "CASES", "run", "main"]
+
+
+class Case(NamedTuple):
+    """
+    A single benchmark: a named, argument-less callable.
+    """
+
+    name: str
+    func: Callable[[], Any]
+
+
+def _fresh(expr: str) -> ExpressDate:
+    """
+    Builds an ExpressDate without going through the compile cache,
+    so that cached counts and expansions do not hide the real cost.
+
+    :param expr: The expression to build.
+    :return: A new ExpressDate instance.
+    """
+    return ExpressDate(ExpressDateParser.compile(expr, cache=False))
+
+
+def _cases() -> list[Case]:
+    """
+    Builds the benchmark cases.
+
+    :return: The list of every benchmark case.
+    """
+    decade_a = ExpressDate("2000-01-01 ~ 2009-12-31")
+    decade_b = ExpressDate("2005-01-01 ~ 2014-12-31")
+    fridays = ExpressDate("20**-**-**, fri")
+    mondays = ExpressDate("2024-**-**, mon")
+    century = ExpressDate("1900-01-01 ~ 1999-12-31")
+    small_a = ExpressDate("2024-08-10 ~ 2024-08-16")
+    small_b = ExpressDate("2024-08-14 ~ 2024-08-19")
+    day = date(2024, 8, 16)
+    parse = ExpressDateParser.parse
+    parse_expr_date = ExpressDateParser.parse_expr_date
+
+    return [
+        # Single dates
+        Case("single/parse_const_date",
+             lambda: ExpressDateParser.parse_const_date("2024-08-15")),
+        Case("single/parse_american",
+             lambda: ExpressDateParser.parse_const_date("08-15-2024")),
+        Case("single/express", lambda: ExpressDate("2024-08-15")),
+        Case("single/compile_uncached",
+             lambda: ExpressDateParser.compile("2024-08-15", cache=False)),
+        # Ranges
+        Case("range/10", lambda: parse("2024-08-10 ~ 2024-08-19")),
+        Case("range/10k", lambda: parse("2000-01-01 ~ 2027-05-18")),
+        Case("range/1m", lambda: parse("0001-01-01 ~ 2738-11-28")),
+        Case("range/len_1m", lambda: len(_fresh("0001-01-01 ~ 2738-11-28"))),
+        # Wildcards
+        Case("wildcard/2024-08-1*", lambda: parse_expr_date("2024-08-1*")),
+        Case("wildcard/19**-**-10", lambda: parse_expr_date("19**-**-10")),
+        Case("wildcard/20**-**-**", lambda: parse_expr_date("20**-**-**")),
+        Case("wildcard/****-**-**", lambda: parse_expr_date("****-**-**")),
+        Case("wildcard/len_****-**-**", lambda: len(_fresh("****-**-**"))),
+        Case("wildcard/first_last_****-**-**",
+             lambda: (_fresh("****-**-**").first, _fresh("****-**-**").last)),
+        # Weekday filters
+        Case("weekday/2024-**-**, mon",
+             lambda: parse_expr_date("2024-**-**, mon")),
+        Case("weekday/****-**-**, mon",
+             lambda: parse_expr_date("****-**-**, mon")),
+        Case("weekday/len_****-**-**, mon",
+             lambda: len(_fresh("****-**-**, mon"))),
+        # Membership tests
+        Case("contains/pattern", lambda: day in fridays),
+        Case("contains/range", lambda: day in century),
+        Case("contains/string", lambda: "2024-08-16" in fridays),
+        # Set operations
+        Case("setops/intersection_decades",
+             lambda: decade_a.intersection(decade_b)),
+        Case("setops/union_decades", lambda: decade_a.union(decade_b)),
+        Case("setops/and_operator_small", lambda: small_a & small_b),
+        Case("setops/or_operator_decades", lambda: decade_a | decade_b),
+        Case("setops/xor_weekdays", lambda: fridays.symmetric_difference(mondays)),
+        Case("setops/difference_pattern_range",
+             lambda: fridays.difference(century)),
+    ]
+
+
+CASES = _cases()
+
+
+def measure(case: Case, repeat: int) -> dict[str, Any]:
+    """
+    Times a benchmark case.
+
+    The number of calls per round is calibrated so that a round lasts
+    at least 0.2 seconds, and the round is repeated `repeat` times.
+
+    :param case: The case to time.
+    :param repeat: The number of rounds.
+    :return: A dictionary with the per-call timings in seconds.
+    """
+    timer = timeit.Timer(case.func)
+    number, _ = timer.autorange()
+    rounds = [total / number for total in timer.repeat(repeat, number)]
+    return {
+        "name": case.name,
+        "number": number,
+        "repeat": repeat,
+        "best": min(rounds),
+        "mean": statistics.fmean(rounds),
+        "stdev": statistics.stdev(rounds) if len(rounds) > 1 else 0.0,
+    }
+
+
+def profile(case: Case, limit: int = 15) -> list[dict[str, Any]]:
+    """
+    Profiles a single call of a benchmark case with cProfile.
+
+    :param case: The case to profile.
+    :param limit: The number of functions to report.
+    :return: The most expensive functions by cumulative time.
+    """
+    profiler = cProfile.Profile()
+    profiler.runcall(case.func)
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    stats.sort_stats(pstats.SortKey.CUMULATIVE)
+    entries = []
+    for func in stats.fcn_list[:limit]:  # type: ignore [attr-defined]
+        _, ncalls, tottime, cumtime, _ = stats.stats[func]  # type: ignore
+        filename, line, name = func
+        entries.append({
+            "function": f"{filename}:{line}({name})",
+            "ncalls": ncalls,
+            "tottime": tottime,
+            "cumtime": cumtime,
+        })
+    return entries
+
+
+def run(cases: Sequence[Case], repeat: int = 5,
+        profile_slowest: int = 0) -> dict[str, Any]:
+    """
+    Runs benchmark cases and collects the results.
+
+    :param cases: The cases to run.
+    :param repeat: The number of rounds per case.
+    :param profile_slowest: The number of slowest cases to profile.
+    :return: A JSON-serializable dictionary with metadata and results.
+    """
+    results = [measure(case, repeat) for case in cases]
+    if profile_slowest > 0:
+        by_name = {case.name: case for case in cases}
+        slowest = sorted(results, key=lambda r: r["best"], reverse=True)
+        for result in slowest[:profile_slowest]:
+            result["profile"] = profile(by_name[result["name"]])
+
+    try:
+        version = metadata.version("expressdate")
+    except metadata.PackageNotFoundError:
+        version = None
+    return {
+        "meta": {
+            "expressdate": version,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Runs the benchmarks from the command line.
+
+    :param argv: The command line arguments, without the program name.
+    :return: The exit status.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m expressdate.bench",
+        description="Benchmark the expressdate parser and operations.",
+    )
+    parser.add_argument("--filter", default="",
+                        help="only run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of timing rounds per case (default: 5)")
+    parser.add_argument("--profile", type=int, default=0, metavar="N",
+                        help="profile the N slowest cases with cProfile")
+    parser.add_argument("--output", default="-",
+                        help="file to write the JSON results to (default: stdout)")
+    parser.add_argument("--list", action="store_true",
+                        help="list the case names and exit")
+    args = parser.parse_args(argv)
+
+    cases = [case for case in CASES if args.filter in case.name]
+    if args.list:
+        print("\n".join(case.name for case in cases))
+        return 0
+    if not cases:
+        print("No benchmark case matches the filter.", file=sys.stderr)
+        return 1
+
+    report = json.dumps(run(cases, args.repeat, args.profile), indent=2)
+    if args.output == "-":
+        print(report)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+from __future__ import annotations
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, NamedTuple
+
+__all__ = ["CacheInfo", "LRUCache"]
+
+
+class CacheInfo(NamedTuple):
+    """
+    A snapshot of the statistics of an LRUCache.
+    """
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache:
+    """
+    A bounded, thread-safe cache that evicts the least recently used entry
+    once it holds more than `maxsize` entries.
+    A cache with a `maxsize` of 0 stores nothing.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Initializes an LRUCache instance.
+
+        :param maxsize: The maximum number of entries to keep.
+        :raises ValueError: If the size is negative.
+        """
+        if maxsize < 0:
+            raise ValueError("Invalid cache size.")
+        self._maxsize = maxsize
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self) -> int:
+        """
+        Provides the number of entries currently stored.
+
+        :return: The number of cached entries.
+        """
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Looks up an entry and marks it as the most recently used.
+
+        :param key: The key of the entry.
+        :param default: The value returned when the key is not cached.
+        :return: The cached value, or the default if there is none.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Stores an entry, evicting the least recently used entries if needed.
+
+        :param key: The key of the entry.
+        :param value: The value to cache.
+        """
+        with self._lock:
+            if self._maxsize == 0:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        """
+        Changes the maximum number of entries,
+        evicting the least recently used entries if needed.
+
+        :param maxsize: The new maximum number of entries.
+        :raises ValueError: If the size is negative.
+        """
+        if maxsize < 0:
+            raise ValueError("Invalid cache size.")
+        with self._lock:
+            self._maxsize = maxsize
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Removes every entry and resets the statistics.
+        """
+        with self._lock:
+            self._data.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def info(self) -> CacheInfo:
+        """
+        Reports the statistics of this cache.
+
+        :return: A CacheInfo with the hits, misses, maximum and current size.
+        """
+        with self._lock:
+            return CacheInfo(self._hits, self._misses,
+                             self._maxsize, len(self._data))
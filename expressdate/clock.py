@@ -0,0 +1,50 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, tzinfo
+from typing import Iterator
+
+__all__ = ["today", "frozen"]
+
+# The date pinned as 'today' by `frozen`, per thread and per asyncio task.
+_FROZEN: ContextVar[date | None] = ContextVar("expressdate_today", default=None)
+
+
+def today(tz: tzinfo | None = None) -> date:
+    """
+    Returns the date used as 'today' by relative expressions.
+
+    Within a `frozen` block, this is the pinned date and the clock is
+    not read at all; otherwise, it is the current date in the timezone.
+
+    :param tz: An optional timezone, used for reading the clock.
+    :return: The date of 'today'.
+    """
+    pinned = _FROZEN.get()
+    if pinned is not None:
+        return pinned
+    return datetime.now(tz=tz).date()
+
+
+@contextmanager
+def frozen(value: date | None = None, tz: tzinfo | None = None) -> Iterator[date]:
+    """
+    Pins 'today' for every relative expression evaluated within the block,
+    e.g. for a batch or a request, so they all agree even across midnight
+    and the clock is read at most once.
+
+    The pinned date is stored in a context variable, so concurrent threads
+    and asyncio tasks can each pin their own date. Blocks may be nested.
+
+    :param value: The date to use as 'today'. If omitted,
+                  the clock is read once, in the given timezone.
+    :param tz: An optional timezone, used for reading the clock.
+    :return: A context manager yielding the pinned date.
+    """
+    if value is None:
+        value = today(tz)
+    token = _FROZEN.set(value)
+    try:
+        yield value
+    finally:
+        _FROZEN.reset(token)
@@ -0,0 +1,177 @@
+from __future__ import annotations
+from datetime import date, timedelta, tzinfo
+from typing import Iterable, Iterator
+from . import clock
+from .dateset import DatePattern, DateRuns, DateSet
+from .metrics import metrics
+
+__all__ = ["CompiledExpr"]
+
+
+class CompiledExpr:
+    """
+    An immutable, pre-parsed date expression that can be evaluated repeatedly.
+
+    A compiled expression is either a wildcard pattern or a range between
+    two terms, where a single date is a range whose terms are equal.
+    Each term is either an exact date or an offset in days from 'today',
+    so relative expressions are resolved again on every evaluation while
+    the parsing work is done only once.
+    """
+
+    __slots__ = ("_expr", "_pattern", "_left", "_right", "_set")
+
+    def __init__(
+        self,
+        expr: str,
+        pattern: DatePattern | None = None,
+        left: date | int | None = None,
+        right: date | int | None = None,
+    ):
+        """
+        Initializes a CompiledExpr instance.
+
+        :param expr: The source expression.
+        :param pattern: The digit constraints of a wildcard expression.
+        :param left: The starting term of a range.
+        :param right: The ending term of a range.
+        :raises ValueError: If neither a pattern nor both terms are given,
+                            or if an absolute range is in the wrong order.
+        """
+        if pattern is None and (left is None or right is None):
+            raise ValueError("Invalid date expression.")
+        self._expr = expr
+        self._pattern = pattern
+        self._left = left
+        self._right = right
+        self._set: DateSet | None = pattern
+        # Absolute ranges never change, so they are resolved only once.
+        if pattern is None and not self.is_relative:
+            self._set = DateRuns.from_range(left, right)  # type: ignore
+
+    def __repr__(self) -> str:
+        """
+        Returns an official string representation of
+        the CompiledExpr object for debugging.
+
+        :return: A string in the form CompiledExpr('expression').
+        """
+        return f"CompiledExpr('{self._expr}')"
+
+    @property
+    def expr(self) -> str:
+        """
+        Returns the source expression of this compiled expression.
+
+        :return: The expression as a string.
+        """
+        return self._expr
+
+    @property
+    def pattern(self) -> DatePattern | None:
+        """
+        Returns the digit constraints of a wildcard expression.
+
+        :return: A DatePattern, or None if the expression is a range.
+        """
+        return self._pattern
+
+    @property
+    def terms(self) -> tuple[date | int, date | int] | None:
+        """
+        Returns the terms of a range expression, where a single date
+        is a range whose terms are equal.
+
+        :return: The starting and ending terms, each an exact date or
+                 an offset in days from 'today', or None for a pattern.
+        """
+        if self._pattern is not None:
+            return None
+        return self._left, self._right  # type: ignore
+
+    @property
+    def is_relative(self) -> bool:
+        """
+        Indicates whether the expression depends on the current date.
+
+        :return: True if a term is relative to 'today', otherwise False.
+        """
+        return isinstance(self._left, int) or isinstance(self._right, int)
+
+    def evaluate(self, tz: tzinfo | None = None,
+                 today: date | None = None) -> DateSet:
+        """
+        Resolves the expression into a date set.
+
+        :param tz: An optional timezone, used for determining 'today'.
+        :param today: An optional date used as 'today' instead of the clock
+                      or the date pinned by `clock.frozen`.
+        :return: A DateSet describing the dates of the expression.
+        :raises ValueError: If the resolved date range is incorrect.
+        """
+        if self._set is not None:
+            return self._set
+        with metrics.timer(self._expr, "resolve"):
+            if today is None:
+                today = clock.today(tz)
+            return DateRuns.from_range(
+                self.resolve(self._left, today),  # type: ignore
+                self.resolve(self._right, today),  # type: ignore
+            )
+
+    def matches(self, value: object, tz: tzinfo | None = None,
+                today: date | None = None) -> bool:
+        """
+        Checks whether a date satisfies the expression, by testing the
+        digits and weekday of a pattern or the bounds of a range directly,
+        without expanding the expression.
+
+        :param value: The date to test.
+        :param tz: An optional timezone, used for determining 'today'.
+        :param today: An optional date used as 'today' instead of the clock
+                      or the date pinned by `clock.frozen`.
+        :return: True if the value is a date of the expression, otherwise False.
+        :raises ValueError: If the resolved date range is incorrect.
+        """
+        if self._set is not None:
+            return value in self._set
+        if today is None:
+            today = clock.today(tz)
+        left = self.resolve(self._left, today).toordinal()  # type: ignore
+        right = self.resolve(self._right, today).toordinal()  # type: ignore
+        # The range is checked like `evaluate`, whatever the value.
+        if left > right:
+            raise ValueError("Invalid date range.")
+        return isinstance(value, date) and left <= value.toordinal() <= right
+
+    def filter(self, values: Iterable[date], tz: tzinfo | None = None,
+               today: date | None = None) -> Iterator[date]:
+        """
+        Lazily keeps the dates of an iterable that satisfy the expression.
+
+        'today' is resolved once, when this method is called, and each date
+        is then tested like `matches`, so a stream of any length is
+        filtered in constant memory. Values that are not dates are skipped.
+
+        :param values: An iterable of dates, e.g. a stream of event dates.
+        :param tz: An optional timezone, used for determining 'today'.
+        :param today: An optional date used as 'today' instead of the clock
+                      or the date pinned by `clock.frozen`.
+        :return: An iterator over the matching dates, in their order.
+        :raises ValueError: If the resolved date range is incorrect.
+        """
+        contains = self.evaluate(tz, today).__contains__
+        return (value for value in values if contains(value))
+
+    @staticmethod
+    def resolve(term: date | int, today: date) -> date:
+        """
+        Resolves a single term into a date.
+
+        :param term: An exact date or an offset in days from 'today'.
+        :param today: The date used as 'today'.
+        :return: The resolved date.
+        """
+        if isinstance(term, int):
+            return today + timedelta(days=term)
+        return term
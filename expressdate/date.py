@@ -1,10 +1,20 @@
 from __future__ import annotations
-from datetime import date, timedelta
-from typing import Iterator
+from datetime import date, timedelta, tzinfo
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+from .compiled import CompiledExpr
+from .dateset import DateArray, DateBitmap, DatePattern, DateRuns, DateSet
+from .metrics import metrics
 from .parse import ExpressDateParser
+from .wire import decode, encode
+
+if TYPE_CHECKING:
+    import numpy
 
 __all__ = ["ExpressDate"]
 
+# The maximum length of the expression shown by repr().
+REPR_LIMIT = 80
+
 
 class ExpressDate:
     """
@@ -15,36 +25,150 @@ class ExpressDate:
     date manipulation and comparison.
     """
 
-    def __init__(self, expr: date | str):
+    def __init__(self, expr: date | str | CompiledExpr,
+                 max_dates: int | None = None, tz: tzinfo | None = None):
         """
         Initializes an ExpressDate instance.
 
-        If the argument is a string, it is parsed to extract one or more dates.
+        If the argument is a string, it is parsed into a compact date set;
+        the dates themselves are only generated when they are requested.
+        If the argument is a compiled expression, it is evaluated as is.
         If the argument is a Python date object, it is stored as a single date.
 
-        :param expr: A Python date object or a string 
+        :param expr: A Python date object, a string or a compiled expression
                      that specifies one or more dates.
+        :param max_dates: An optional maximum number of dates. The size is
+                          checked arithmetically, before any date is generated.
+        :param tz: An optional timezone, used for determining 'today'
+                   in relative expressions.
         :raises TypeError: If the provided argument is 
-                           neither a date nor a string.
+                           neither a date, a string nor a compiled expression.
+        :raises ExpansionLimitError: If the expression describes
+                                     more than `max_dates` dates.
         """
+        # The expression is None for the results of set operations.
+        self._expr: str | None
         if isinstance(expr, str):
             self._expr = expr
-            self._date = ExpressDateParser.parse(expr)
+            self._set = ExpressDateParser.parse_set(expr, tz)
+        elif isinstance(expr, CompiledExpr):
+            self._expr = expr.expr
+            self._set = expr.evaluate(tz)
         elif isinstance(expr, date):
             self._expr = expr.strftime("%m-%d-%Y")
-            self._date = (expr,)
+            self._set = DateRuns.from_date(expr)
         else:
             raise TypeError("Invalid type.")
+        ExpressDateParser.check_limit(self._expr, self._set, max_dates)
+        # The timezone is kept for parsing the operands of later operations.
+        self._tz = tz
+        # The ordinals of a pattern are materialized on first access.
+        self._array: DateArray | None = None
+        # The hash is computed on first use.
+        self._hash: int | None = None
+        # The description of a set operation result, built on first use.
+        self._text: str | None = None
+        # The tuple of dates, built on first access.
+        self._dates: tuple[date, ...] | None = None
+
+    @classmethod
+    def from_set(cls, date_set: DateSet, expr: str | None = None,
+                 tz: tzinfo | None = None) -> ExpressDate:
+        """
+        Creates an ExpressDate directly from a date set, without parsing.
+
+        :param date_set: The dates of the new instance.
+        :param expr: An optional expression describing the dates. If omitted,
+                     the dates are described by their ranges when needed.
+        :param tz: An optional timezone, used for determining 'today'
+                   in the operands of later operations.
+        :return: A new ExpressDate instance.
+        """
+        instance = cls.__new__(cls)
+        instance._expr = expr
+        instance._set = date_set
+        instance._tz = tz
+        instance._array = None
+        instance._hash = None
+        instance._text = None
+        instance._dates = None
+        return instance
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> ExpressDate:
+        """
+        Restores an ExpressDate encoded by `to_bytes`.
+        The expression is not parsed again and the clock is not read,
+        so relative expressions keep the dates they had when encoded.
+        The timezone is not serialized, so the restored instance has none.
+
+        :param data: The encoded bytes.
+        :return: A new ExpressDate instance.
+        :raises ValueError: If the data is invalid or of an unsupported version.
+        """
+        date_set, expr = decode(data)
+        return cls.from_set(date_set, expr)
+
+    def to_bytes(self) -> bytes:
+        """
+        Encodes this instance in a compact, versioned binary format.
+
+        Wildcard expressions are encoded by their digits and anything else
+        by its runs of consecutive dates, so even a range spanning
+        centuries takes a few bytes plus the expression itself.
+
+        :return: The encoded bytes.
+        """
+        return encode(self._set, self._expr)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """
+        Pickles this instance through its binary encoding
+        rather than through its dates.
+
+        :return: The arguments to restore this instance with `from_bytes`.
+        """
+        return type(self).from_bytes, (self.to_bytes(),)
+
+    @classmethod
+    def coerce(cls, other: ExpressDate | tuple[date, ...] | date | str,
+               tz: tzinfo | None = None) -> DateSet:
+        """
+        Converts an operand of the set operations into a date set.
+
+        :param other: An ExpressDate, a tuple of dates, a Python date,
+                      or a string expression.
+        :param tz: An optional timezone, used for determining 'today'
+                   if the operand is a relative expression.
+        :return: A DateSet holding the dates of the operand.
+        :raises TypeError: If the operand is of an unsupported type.
+        """
+        if isinstance(other, ExpressDate):
+            return other._set
+        elif isinstance(other, tuple):
+            return DateArray.from_dates(other)
+        return ExpressDate(other, tz=tz)._set
 
     def __hash__(self) -> int:
         """
         Returns the hash of the internal dates.
-        The hash is computed based on the tuple of 
-        date objects stored in this instance.
+        The hash is computed once from the number of dates and
+        the first and last dates, which are identical for equal sets
+        and are known without expanding the dates.
 
         :return: An integer hash value.
         """
-        return hash(self._date)
+        if self._hash is None:
+            date_set = self._set
+            if len(date_set) == 0:
+                self._hash = hash(())
+            else:
+                self._hash = hash((
+                    len(date_set),
+                    date_set.first.toordinal(),
+                    date_set.last.toordinal(),
+                ))
+        return self._hash
 
     def __str__(self) -> str:
         """
@@ -55,7 +179,17 @@ class ExpressDate:
 
         :return: The date expression as a string.
         """
-        return self._expr
+        if self._expr is not None:
+            return self._expr
+        if self._text is None:
+            # Results of set operations are described by their ranges.
+            # The description is cached apart from the expression, since
+            # it cannot be parsed back and may be arbitrarily long.
+            self._text = " | ".join(
+                self.describe(date.fromordinal(start), date.fromordinal(stop - 1))
+                for start, stop in self._set.runs()
+            )
+        return self._text
 
     def __repr__(self) -> str:
         """
@@ -63,9 +197,13 @@ class ExpressDate:
         the ExpressDate object for debugging.
 
         :return: A string in the form ExpressDate('MM-DD-YYYY') 
-                 or an equivalent expression.
+                 or an equivalent expression, shortened with '...'
+                 if it is longer than `REPR_LIMIT` characters.
         """
-        return f"ExpressDate('{self._expr}')"
+        text = str(self)
+        if len(text) > REPR_LIMIT:
+            text = text[:REPR_LIMIT - 3] + "..."
+        return f"ExpressDate('{text}')"
     
     def __len__(self) -> int:
         """
@@ -73,15 +211,70 @@ class ExpressDate:
 
         :return: An integer representing how many distinct dates are stored.
         """
-        return len(self._date)
+        return len(self._set)
     
     def __iter__(self) -> Iterator[date]:
         """
-        Returns an iterator over the internal tuple of date objects.
+        Returns an iterator over the date objects of this instance.
+        The dates are generated lazily unless they were already materialized.
     
         :return: An iterator over the date objects stored in this instance.
         """
-        return iter(self._date)
+        if self._dates is not None:
+            return iter(self._dates)
+        if self._array is not None:
+            return iter(self._array)
+        return iter(self._set)
+
+    def __getitem__(self, index: int | slice) -> date | tuple[date, ...]:
+        """
+        Retrieves dates by their position, without expanding the others.
+
+        Positions are located from the structure of the dates: offsets into
+        the ranges, or counts per year and month for wildcard expressions.
+        Negative positions count from the last date, and slices may have
+        a step, so a page of a large schedule stays cheap to retrieve.
+
+        :param index: The position of a date, or a slice of positions.
+        :return: The date at the position, or a tuple of the sliced dates.
+        :raises IndexError: If the position is out of range.
+        :raises TypeError: If the index is neither an integer nor a slice.
+        """
+        date_set = self._array if self._array is not None else self._set
+        if isinstance(index, slice):
+            return tuple(
+                date.fromordinal(date_set.select(i))
+                for i in range(*index.indices(len(date_set)))
+            )
+        if not isinstance(index, int):
+            raise TypeError("Invalid type.")
+        if index < 0:
+            index += len(date_set)
+        if index < 0:
+            raise IndexError("ExpressDate index out of range.")
+        try:
+            return date.fromordinal(date_set.select(index))
+        except IndexError:
+            raise IndexError("ExpressDate index out of range.") from None
+
+    def index(self, value: ExpressDate | date | str) -> int:
+        """
+        Finds the position of a date, without expanding the dates before it.
+
+        :param value: A single-day ExpressDate, a Python date, or a string.
+        :return: The position of the date, starting from 0.
+        :raises ValueError: If the date is not in this instance, or if
+                            the ExpressDate represents more than one day.
+        """
+        if isinstance(value, ExpressDate):
+            if not value.is_single_day:
+                raise ValueError("ExpressDate object must represent a single day.")
+            value = value.first
+        elif isinstance(value, str):
+            value = ExpressDateParser.parse_const_date(value)
+        if value not in self:
+            raise ValueError(f"{value} is not in ExpressDate.")
+        return self._set.rank(value.toordinal())
 
     def __add__(self, other: timedelta | int) -> tuple[date, ...]:
         """
@@ -94,7 +287,7 @@ class ExpressDate:
         """
         if isinstance(other, int):
             other = timedelta(days=other)
-        return tuple(i + other for i in self._date)
+        return tuple(i + other for i in self)
 
     def __radd__(self, other: timedelta) -> tuple[date, ...]:
         """
@@ -114,11 +307,7 @@ class ExpressDate:
         :param other: Another ExpressDate, a tuple of date objects, or a string.
         :return: A tuple of date objects that remain after the subtraction.
         """
-        if isinstance(other, ExpressDate):
-            return tuple(sorted(set(self._date) - set(other.dates)))
-        elif isinstance(other, tuple):
-            return tuple(sorted(set(self._date) - set(other)))
-        return tuple(sorted(set(self._date) - set(ExpressDate(other).dates)))
+        return self.difference(other).dates
 
     def __rsub__(self, other: tuple[date, ...] | str) -> tuple[date, ...]:
         """
@@ -128,24 +317,26 @@ class ExpressDate:
         :param other: A tuple of date objects or a string expression.
         :return: A tuple of date objects that remain after the subtraction.
         """
-        if isinstance(other, tuple):
-            return tuple(sorted(set(other) - set(self._date)))
-        return tuple(sorted(set(ExpressDate(other).dates) - set(self._date)))
+        return tuple(self.coerce(other, self._tz).difference(self._set))
 
     def __eq__(self, other: object) -> bool:
         """
         Checks if this ExpressDate object is equal to another object.
-        Equality is determined by comparing the sets of dates.
+        Equality is determined by comparing the sets of dates:
+        the cached hashes reject most unequal objects at once, and
+        the remaining ones are compared structurally, without expansion.
 
         :param other: Another ExpressDate, a Python date, or a string.
         :return: True if they represent the same set of dates, otherwise False.
         """
+        if isinstance(other, str):
+            other = ExpressDate(other, tz=self._tz)
         if isinstance(other, ExpressDate):
-            return hash(self) == hash(other)
+            if hash(self) != hash(other):
+                return False
+            return self._set.equals(other._set)
         elif isinstance(other, date):
-            return self._date == (other,)
-        elif isinstance(other, str):
-            return hash(self) == hash(ExpressDate(other))
+            return len(self._set) == 1 and self._set.first == other
         return False
 
     def __ne__(self, other: object) -> bool:
@@ -167,11 +358,7 @@ class ExpressDate:
                       or a string expression.
         :return: A tuple containing all unique dates from both.
         """
-        if isinstance(other, ExpressDate):
-            return tuple(sorted(set(self._date) | set(other._date)))
-        elif isinstance(other, tuple):
-            return tuple(sorted(set(self._date) | set(other)))
-        return tuple(sorted(set(self._date) | set(ExpressDate(other).dates)))
+        return self.union(other).dates
 
     def __ror__(self, other: tuple[date, ...] | str) -> tuple[date, ...]:
         """
@@ -192,11 +379,7 @@ class ExpressDate:
                       or a string expression.
         :return: A tuple of dates that appear in both sets.
         """
-        if isinstance(other, ExpressDate):
-            return tuple(sorted(set(self._date) & set(other._date)))
-        elif isinstance(other, tuple):
-            return tuple(sorted(set(self._date) & set(other)))
-        return tuple(sorted(set(self._date) & set(ExpressDate(other).dates)))
+        return self.intersection(other).dates
 
     def __rand__(self, other: tuple[date, ...] | str) -> tuple[date, ...]:
         """
@@ -218,11 +401,7 @@ class ExpressDate:
         :return: A tuple containing the symmetric difference of 
                  the two sets of dates.
         """
-        if isinstance(other, ExpressDate):
-            return tuple(sorted(set(self._date) ^ set(other._date)))
-        elif isinstance(other, tuple):
-            return tuple(sorted(set(self._date) ^ set(other)))
-        return tuple(sorted(set(self._date) ^ set(ExpressDate(other).dates)))
+        return self.symmetric_difference(other).dates
 
     def __rxor__(self, other: tuple[date, ...] | str) -> tuple[date, ...]:
         """
@@ -235,10 +414,65 @@ class ExpressDate:
         """
         return self.__xor__(other)
 
+    def union(self, other: ExpressDate | tuple[date, ...] | str) -> ExpressDate:
+        """
+        Merges all unique dates from both objects
+        without materializing either of them.
+
+        :param other: Another ExpressDate, a tuple of dates,
+                      or a string expression.
+        :return: A new ExpressDate containing the dates of both.
+        """
+        with metrics.timer(self._expr, "operate"):
+            date_set = self._set.union(self.coerce(other, self._tz))
+            return ExpressDate.from_set(date_set, tz=self._tz)
+
+    def intersection(self, other: ExpressDate | tuple[date, ...] | str) -> ExpressDate:
+        """
+        Finds dates common to both objects
+        without materializing either of them.
+
+        :param other: Another ExpressDate, a tuple of dates,
+                      or a string expression.
+        :return: A new ExpressDate containing the dates that appear in both.
+        """
+        with metrics.timer(self._expr, "operate"):
+            date_set = self._set.intersection(self.coerce(other, self._tz))
+            return ExpressDate.from_set(date_set, tz=self._tz)
+
+    def difference(self, other: ExpressDate | tuple[date, ...] | str) -> ExpressDate:
+        """
+        Removes the dates of another object from this instance
+        without materializing either of them.
+
+        :param other: Another ExpressDate, a tuple of dates,
+                      or a string expression.
+        :return: A new ExpressDate containing the remaining dates.
+        """
+        with metrics.timer(self._expr, "operate"):
+            date_set = self._set.difference(self.coerce(other, self._tz))
+            return ExpressDate.from_set(date_set, tz=self._tz)
+
+    def symmetric_difference(
+        self, other: ExpressDate | tuple[date, ...] | str
+    ) -> ExpressDate:
+        """
+        Finds dates that are in either object but not in both
+        without materializing either of them.
+
+        :param other: Another ExpressDate, a tuple of dates,
+                      or a string expression.
+        :return: A new ExpressDate containing the symmetric difference.
+        """
+        with metrics.timer(self._expr, "operate"):
+            date_set = self._set.symmetric_difference(self.coerce(other, self._tz))
+            return ExpressDate.from_set(date_set, tz=self._tz)
+
     def __contains__(self, other: ExpressDate | date | str) -> bool:
         """
         Checks whether a given single-day ExpressDate, Python date, or string
         is contained within this ExpressDate.
+        The check is answered by the date set without expanding it.
 
         :param other: A single-day ExpressDate, a Python date, or a string.
         :return: True if it is contained, False otherwise.
@@ -250,13 +484,28 @@ class ExpressDate:
         if isinstance(other, ExpressDate):
             if not other.is_single_day:
                 raise ValueError("ExpressDate object must represent a single day.")
-            return other.first in self._date
+            return other.first in self._set
         elif isinstance(other, date):
-            return other in self._date
+            return other in self._set
         elif isinstance(other, str):
-            return ExpressDateParser.parse_const_date(other) in self._date
+            return ExpressDateParser.parse_const_date(other) in self._set
         raise TypeError("Invalid type.")
 
+    def filter(self, values: Iterable[date]) -> Iterator[date]:
+        """
+        Lazily keeps the dates of an iterable that belong to this instance.
+
+        Each date is tested against the digits, weekday or bounds of the
+        expression, so the expression is never expanded and a stream of
+        any length is filtered in constant memory. Unlike `in`, strings
+        are not parsed; values that are not dates are skipped.
+
+        :param values: An iterable of dates, e.g. a stream of event dates.
+        :return: An iterator over the matching dates, in their order.
+        """
+        contains = self._set.__contains__
+        return (value for value in values if contains(value))
+
     def __matmul__(self, other: ExpressDate | date | str) -> ExpressDate:
         """
         Uses the @ operator to combine two single-day ExpressDate objects 
@@ -278,7 +527,7 @@ class ExpressDate:
             other = ExpressDateParser.parse_const_date(other)
         left = self.first.strftime("%m-%d-%Y")
         right = other.strftime("%m-%d-%Y")
-        return ExpressDate(f"{left} ~ {right}")
+        return ExpressDate(f"{left} ~ {right}", tz=self._tz)
 
     def __rmatmul__(self, other: date | str) -> ExpressDate:
         """
@@ -289,7 +538,33 @@ class ExpressDate:
         :param other: A single Python date or string expression.
         :return: A new ExpressDate object representing the resulting date range.
         """
-        return ExpressDate(other).__matmul__(self)
+        return ExpressDate(other, tz=self._tz).__matmul__(self)
+
+    def to_numpy(self) -> numpy.ndarray:
+        """
+        Exports the dates of this instance as a NumPy array.
+        The array is generated directly from the date set,
+        without creating Python date objects.
+
+        :return: A one-dimensional numpy.datetime64[D] array 
+                 of the dates in ascending order.
+        :raises ImportError: If NumPy is not installed.
+        """
+        return self._set.to_numpy()
+
+    @staticmethod
+    def describe(left: date, right: date) -> str:
+        """
+        Describes a date range as an expression.
+
+        :param left: The starting date of the range.
+        :param right: The ending date of the range.
+        :return: A string in the form 'MM-DD-YYYY ~ MM-DD-YYYY',
+                 or 'MM-DD-YYYY' if both dates are equal.
+        """
+        if left == right:
+            return left.strftime("%m-%d-%Y")
+        return f"{left.strftime('%m-%d-%Y')} ~ {right.strftime('%m-%d-%Y')}"
 
     @property
     def is_const(self) -> bool:
@@ -300,6 +575,8 @@ class ExpressDate:
         :return: True if there are no '*' or '~' characters in the expression, 
                  otherwise False.
         """
+        if self._expr is None:
+            return self.is_single_day
         return "*" not in self._expr and "~" not in self._expr
 
     @property
@@ -310,7 +587,7 @@ class ExpressDate:
         :return: True if the internal tuple contains a single date, 
                  otherwise False.
         """
-        return len(self._date) == 1
+        return len(self._set) == 1
 
     @property
     def is_continuous(self) -> bool:
@@ -320,10 +597,7 @@ class ExpressDate:
         :return: True if the dates are consecutive days in ascending order, 
                  otherwise False.
         """
-        for i in range(len(self._date) - 1):
-            if self._date[i] + timedelta(days=1) != self._date[i + 1]:
-                return False
-        return True
+        return self._set.is_continuous
 
     @property
     def length(self) -> int:
@@ -339,9 +613,51 @@ class ExpressDate:
         """
         Retrieves all the stored date objects as a tuple.
 
+        The tuple is built once, on first access, and kept by this instance
+        instead of an array of ordinals. Prefer iteration, indexing or `in`
+        for large expressions, which do not create every date object.
+
         :return: A tuple containing every date in this instance.
         """
-        return self._date
+        if self._dates is None:
+            with metrics.timer(self._expr, "expand") as timer:
+                self._dates = tuple(self)
+                timer.count = len(self._dates)
+        return self._dates
+
+    def materialize(self) -> ExpressDate:
+        """
+        Materializes the dates of a wildcard expression as a compact array
+        of ordinals, so that later accesses to them are cheap.
+        Ranges are already cheap to iterate and are left as they are.
+
+        :return: This instance.
+        """
+        if self._array is None and isinstance(self._set, DatePattern):
+            self._array = DateArray.from_set(self._set)
+        return self
+
+    def as_bitmap(self) -> ExpressDate:
+        """
+        Converts the dates into one bitmap per year, so that set operations
+        with this instance are bitwise operations on the bitmaps.
+        This suits dense but irregular sets spanning decades, which would
+        otherwise be held as many short runs or as an array of ordinals.
+
+        :return: A new ExpressDate instance with the same dates and expression.
+        """
+        date_set = DateBitmap.from_set(self._set)
+        return ExpressDate.from_set(date_set, self._expr, self._tz)
+
+    @property
+    def tz(self) -> tzinfo | None:
+        """
+        Returns the timezone used for determining 'today', both for this
+        expression and for the expressions it is combined or compared with.
+
+        :return: The timezone, or None for the local timezone.
+        """
+        return self._tz
 
     @property
     def first(self) -> date:
@@ -350,7 +666,7 @@ class ExpressDate:
 
         :return: The earliest Python date object.
         """
-        return self._date[0]
+        return self._set.first
 
     @property
     def last(self) -> date:
@@ -359,4 +675,4 @@ class ExpressDate:
 
         :return: The latest Python date object.
         """
-        return self._date[-1]
+        return self._set.last
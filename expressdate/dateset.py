@@ -0,0 +1,1305 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date
+from functools import lru_cache
+from itertools import accumulate, chain, product, zip_longest
+from operator import itemgetter
+from typing import (
+    TYPE_CHECKING, Any, Callable, Hashable, Iterable, Iterator, Sequence
+)
+from .tables import (
+    DAYS_BEFORE_MONTH, DAYS_BEFORE_YEAR, DAYS_IN_MONTH, JAN1_WEEKDAY, LEAP,
+    MAX_YEAR, MIN_YEAR
+)
+
+if TYPE_CHECKING:
+    import numpy
+
+__all__ = ["DateSet", "DateRuns", "DateArray", "DatePattern", "DateBitmap"]
+
+# The ordinal of 1970-01-01, the epoch of numpy.datetime64.
+UNIX_EPOCH = 719163
+
+
+class DateSet(ABC):
+    """
+    Base class for the compact structural representations behind ExpressDate.
+    A date set describes its dates as ascending, non-overlapping runs of
+    proleptic Gregorian ordinals, so the dates can be counted, iterated or
+    inspected at the boundaries without materializing every date object.
+    """
+
+    __slots__ = ()
+
+    @property
+    @abstractmethod
+    def key(self) -> Hashable:
+        """
+        Returns a hashable description of the structure of this set.
+        Sets with equal keys always hold the same dates.
+
+        :return: A hashable value describing this set.
+        """
+
+    @abstractmethod
+    def runs(self) -> Iterator[tuple[int, int]]:
+        """
+        Iterates over the runs of this set in ascending order.
+
+        Each run is a half-open pair of ordinals (start, stop),
+        and adjacent runs are always coalesced into a single run.
+
+        :return: An iterator over (start, stop) ordinal pairs.
+        """
+
+    @abstractmethod
+    def reversed_runs(self) -> Iterator[tuple[int, int]]:
+        """
+        Iterates over the runs of this set in descending order.
+
+        :return: An iterator over (start, stop) ordinal pairs.
+        """
+
+    def __iter__(self) -> Iterator[date]:
+        """
+        Lazily yields every date of this set in ascending order.
+
+        :return: An iterator over date objects.
+        """
+        fromordinal = date.fromordinal
+        for start, stop in self.runs():
+            for ordinal in range(start, stop):
+                yield fromordinal(ordinal)
+
+    def __contains__(self, value: object) -> bool:
+        """
+        Checks whether a date belongs to this set by walking its runs.
+
+        :param value: The date to look up.
+        :return: True if the date is in this set, otherwise False.
+        """
+        if not isinstance(value, date):
+            return False
+        ordinal = value.toordinal()
+        for start, stop in self.runs():
+            if ordinal < start:
+                return False
+            if ordinal < stop:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        """
+        Counts the dates of this set from its runs.
+
+        :return: The number of dates in this set.
+        """
+        return sum(stop - start for start, stop in self.runs())
+
+    def equals(self, other: DateSet) -> bool:
+        """
+        Checks whether two sets hold the same dates, without expanding them.
+
+        Sets are told apart by their sizes and boundaries first, and
+        sets of the same kind are compared by their structural keys.
+        Otherwise, continuous sets are equal once their boundaries match,
+        and the runs are only compared as a last resort.
+
+        :param other: The set to compare with.
+        :return: True if both sets hold the same dates, otherwise False.
+        """
+        if self is other:
+            return True
+        if type(self) is type(other) and self.key == other.key:
+            return True
+        length = len(self)
+        if length != len(other):
+            return False
+        if length == 0:
+            return True
+        first = self.first.toordinal()
+        last = self.last.toordinal()
+        if first != other.first.toordinal() or last != other.last.toordinal():
+            return False
+        if last - first + 1 == length:
+            return True
+        return all(a == b for a, b in zip_longest(self.runs(), other.runs()))
+
+    def select(self, index: int) -> int:
+        """
+        Finds the ordinal of the date at a position by walking the runs.
+
+        :param index: The position of the date, from 0 to len - 1.
+        :return: The ordinal of the date.
+        :raises IndexError: If the position is out of range.
+        """
+        if index >= 0:
+            for start, stop in self.runs():
+                if index < stop - start:
+                    return start + index
+                index -= stop - start
+        raise IndexError("Date set index out of range.")
+
+    def rank(self, ordinal: int) -> int:
+        """
+        Counts the dates of this set before an ordinal by walking the runs.
+
+        :param ordinal: The ordinal to look up.
+        :return: The number of dates strictly before the ordinal,
+                 which is the position of the date if it is in this set.
+        """
+        count = 0
+        for start, stop in self.runs():
+            if ordinal <= start:
+                break
+            count += min(ordinal, stop) - start
+        return count
+
+    @property
+    def first(self) -> date:
+        """
+        Returns the earliest date of this set.
+
+        :return: The earliest date object.
+        :raises IndexError: If the set is empty.
+        """
+        for start, _ in self.runs():
+            return date.fromordinal(start)
+        raise IndexError("Date set is empty.")
+
+    @property
+    def last(self) -> date:
+        """
+        Returns the latest date of this set.
+
+        :return: The latest date object.
+        :raises IndexError: If the set is empty.
+        """
+        for _, stop in self.reversed_runs():
+            return date.fromordinal(stop - 1)
+        raise IndexError("Date set is empty.")
+
+    @property
+    def is_continuous(self) -> bool:
+        """
+        Checks whether the dates of this set form a single run.
+
+        The dates are continuous exactly when the number of dates
+        equals the number of days between the first and the last date,
+        so no date has to be generated.
+
+        :return: True if there are no gaps between the dates, otherwise False.
+        """
+        length = len(self)
+        if length <= 1:
+            return True
+        return self.last.toordinal() - self.first.toordinal() + 1 == length
+
+    def to_numpy(self) -> numpy.ndarray:
+        """
+        Expands the dates of this set into a numpy.datetime64[D] array.
+
+        The array is generated from the runs with vectorized operations,
+        so no date object is created.
+
+        :return: A one-dimensional array of the dates in ascending order.
+        :raises ImportError: If NumPy is not installed.
+        """
+        return _expand_runs(_import_numpy(), self.runs())
+
+    def union(self, other: DateSet) -> DateSet:
+        """
+        Merges the dates of both sets.
+
+        :param other: Another date set.
+        :return: A DateRuns with the dates in either set,
+                 or a DateBitmap if the other set is a bitmap.
+        """
+        if isinstance(other, DateBitmap):
+            return DateBitmap.from_set(self).union(other)
+        return self._combine(other, lambda a, b: a or b)
+
+    def intersection(self, other: DateSet) -> DateSet:
+        """
+        Finds the dates common to both sets.
+
+        :param other: Another date set.
+        :return: A DateRuns with the dates in both sets,
+                 or a DateBitmap if the other set is a bitmap.
+        """
+        if isinstance(other, DateBitmap):
+            return DateBitmap.from_set(self).intersection(other)
+        return self._combine(other, lambda a, b: a and b)
+
+    def difference(self, other: DateSet) -> DateSet:
+        """
+        Removes the dates of another set from this set.
+
+        :param other: Another date set.
+        :return: A DateRuns with the dates only in this set,
+                 or a DateBitmap if the other set is a bitmap.
+        """
+        if isinstance(other, DateBitmap):
+            return DateBitmap.from_set(self).difference(other)
+        return self._combine(other, lambda a, b: a and not b)
+
+    def symmetric_difference(self, other: DateSet) -> DateSet:
+        """
+        Finds the dates that are in either set but not in both.
+
+        :param other: Another date set.
+        :return: A DateRuns with the dates in exactly one of the sets,
+                 or a DateBitmap if the other set is a bitmap.
+        """
+        if isinstance(other, DateBitmap):
+            return DateBitmap.from_set(self).symmetric_difference(other)
+        return self._combine(other, lambda a, b: a != b)
+
+    def _combine(self, other: DateSet,
+                 keep: Callable[[bool, bool], bool]) -> DateRuns:
+        """
+        Combines the runs of both sets with a single linear sweep.
+
+        The boundaries of both sets are visited in ascending order and,
+        at each of them, `keep` decides from the membership in either set
+        whether the following days belong to the result.
+
+        :param other: Another date set.
+        :param keep: Decides the membership of the result from
+                     the membership in this set and in the other set.
+        :return: A DateRuns with the resulting dates.
+        """
+        left = _boundaries(self.runs())
+        right = _boundaries(other.runs())
+        next_left = next(left, None)
+        next_right = next(right, None)
+        in_left = in_right = False
+        # Once one side is exhausted, the result may no longer change.
+        done_left = not keep(False, True)
+        done_right = not keep(True, False)
+
+        runs: list[tuple[int, int]] = []
+        start: int | None = None
+        while True:
+            if next_left is None:
+                if next_right is None or done_left:
+                    break
+                position = next_right
+            elif next_right is None:
+                if done_right:
+                    break
+                position = next_left
+            else:
+                position = min(next_left, next_right)
+
+            # Toggle the membership of every side with a boundary here.
+            if next_left == position:
+                in_left = not in_left
+                next_left = next(left, None)
+            if next_right == position:
+                in_right = not in_right
+                next_right = next(right, None)
+
+            inside = keep(in_left, in_right)
+            if inside and start is None:
+                start = position
+            elif not inside and start is not None:
+                runs.append((start, position))
+                start = None
+        return DateRuns(tuple(runs))
+
+
+class DateRuns(DateSet):
+    """
+    A date set stored as an explicit tuple of ordinal runs.
+    Single dates and date ranges are represented by a single run.
+    """
+
+    __slots__ = ("_runs", "_length", "_offsets")
+
+    def __init__(self, runs: tuple[tuple[int, int], ...]):
+        """
+        Initializes a DateRuns instance.
+
+        :param runs: Ascending, non-overlapping and non-adjacent
+                     half-open (start, stop) ordinal pairs.
+        """
+        self._runs = runs
+        self._length = sum(stop - start for start, stop in runs)
+        # The number of dates before each run, computed on first use.
+        self._offsets: tuple[int, ...] | None = None
+
+    @classmethod
+    def from_date(cls, value: date) -> DateRuns:
+        """
+        Creates a date set holding a single date.
+
+        :param value: The date to hold.
+        :return: A DateRuns instance with one run of one day.
+        """
+        ordinal = value.toordinal()
+        return cls(((ordinal, ordinal + 1),))
+
+    @classmethod
+    def from_dates(cls, dates: Iterable[date]) -> DateRuns:
+        """
+        Creates a date set holding the given dates.
+
+        :param dates: Date objects in any order, possibly repeated.
+        :return: A DateRuns instance with the coalesced runs of the dates.
+        """
+        ordinals = sorted({value.toordinal() for value in dates})
+        return cls(tuple(_coalesce(ordinals, step=1)))
+
+    @classmethod
+    def from_range(cls, left: date, right: date) -> DateRuns:
+        """
+        Creates a date set holding every date from left to right (inclusive).
+
+        :param left: The starting date of the range.
+        :param right: The ending date of the range.
+        :return: A DateRuns instance with a single run.
+        :raises ValueError: If the left date is greater than the right date.
+        """
+        if left > right:
+            raise ValueError("Invalid date range.")
+        return cls(((left.toordinal(), right.toordinal() + 1),))
+
+    @property
+    def key(self) -> Hashable:
+        return self._runs
+
+    def runs(self) -> Iterator[tuple[int, int]]:
+        return iter(self._runs)
+
+    def reversed_runs(self) -> Iterator[tuple[int, int]]:
+        return reversed(self._runs)
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, date):
+            return False
+        ordinal = value.toordinal()
+        runs = self._runs
+        # A single range only needs a pair of comparisons.
+        if len(runs) == 1:
+            return runs[0][0] <= ordinal < runs[0][1]
+        # Otherwise, find the last run starting at or before the ordinal.
+        index = bisect_right(runs, ordinal, key=itemgetter(0)) - 1
+        return index >= 0 and ordinal < runs[index][1]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def select(self, index: int) -> int:
+        if not 0 <= index < self._length:
+            raise IndexError("Date set index out of range.")
+        runs = self._runs
+        if len(runs) == 1:
+            return runs[0][0] + index
+        offsets = self._prefix()
+        k = bisect_right(offsets, index) - 1
+        return runs[k][0] + index - offsets[k]
+
+    def rank(self, ordinal: int) -> int:
+        k = bisect_right(self._runs, ordinal, key=itemgetter(0)) - 1
+        if k < 0:
+            return 0
+        start, stop = self._runs[k]
+        return self._prefix()[k] + min(ordinal, stop) - start
+
+    def _prefix(self) -> tuple[int, ...]:
+        """
+        Lists the number of dates before each run.
+        The list is computed once and reused afterwards.
+
+        :return: A tuple with the offset of each run.
+        """
+        if self._offsets is None:
+            self._offsets = tuple(accumulate(
+                (stop - start for start, stop in self._runs[:-1]), initial=0
+            ))
+        return self._offsets
+
+    @property
+    def first(self) -> date:
+        if not self._runs:
+            raise IndexError("Date set is empty.")
+        return date.fromordinal(self._runs[0][0])
+
+    @property
+    def last(self) -> date:
+        if not self._runs:
+            raise IndexError("Date set is empty.")
+        return date.fromordinal(self._runs[-1][1] - 1)
+
+    @property
+    def is_continuous(self) -> bool:
+        return len(self._runs) <= 1
+
+
+class DateArray(DateSet):
+    """
+    A date set stored as a sorted array of ordinals, 4 bytes per date.
+    It is used when dates must be materialized, and date objects are
+    only created when the set is iterated.
+    """
+
+    __slots__ = ("_ordinals",)
+
+    def __init__(self, ordinals: array):
+        """
+        Initializes a DateArray instance.
+
+        :param ordinals: An array('i') of strictly increasing ordinals.
+        """
+        self._ordinals = ordinals
+
+    @classmethod
+    def from_set(cls, date_set: DateSet) -> DateArray:
+        """
+        Materializes the ordinals of another date set.
+
+        :param date_set: The date set to materialize.
+        :return: A DateArray holding the same dates.
+        """
+        if isinstance(date_set, DateArray):
+            return date_set
+        if isinstance(date_set, DatePattern):
+            return cls(date_set.to_array())
+        ordinals = array("i")
+        for start, stop in date_set.runs():
+            ordinals.extend(range(start, stop))
+        return cls(ordinals)
+
+    @classmethod
+    def from_dates(cls, dates: Iterable[date]) -> DateArray:
+        """
+        Creates a date set holding the given dates.
+
+        :param dates: Date objects in any order, possibly repeated.
+        :return: A DateArray instance with the sorted, unique ordinals.
+        """
+        return cls(array("i", sorted({value.toordinal() for value in dates})))
+
+    @property
+    def ordinals(self) -> array:
+        """
+        Returns the underlying array of ordinals.
+
+        :return: An array('i') of strictly increasing ordinals.
+        """
+        return self._ordinals
+
+    @property
+    def key(self) -> Hashable:
+        return self._ordinals.tobytes()
+
+    def runs(self) -> Iterator[tuple[int, int]]:
+        return _coalesce(self._ordinals, step=1)
+
+    def reversed_runs(self) -> Iterator[tuple[int, int]]:
+        for start, stop in _coalesce(reversed(self._ordinals), step=-1):
+            yield stop + 1, start + 1
+
+    def __iter__(self) -> Iterator[date]:
+        return map(date.fromordinal, self._ordinals)
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, date):
+            return False
+        ordinal = value.toordinal()
+        index = bisect_left(self._ordinals, ordinal)
+        return index < len(self._ordinals) and self._ordinals[index] == ordinal
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    def select(self, index: int) -> int:
+        if not 0 <= index < len(self._ordinals):
+            raise IndexError("Date set index out of range.")
+        return self._ordinals[index]
+
+    def rank(self, ordinal: int) -> int:
+        return bisect_left(self._ordinals, ordinal)
+
+    @property
+    def first(self) -> date:
+        if not self._ordinals:
+            raise IndexError("Date set is empty.")
+        return date.fromordinal(self._ordinals[0])
+
+    @property
+    def last(self) -> date:
+        if not self._ordinals:
+            raise IndexError("Date set is empty.")
+        return date.fromordinal(self._ordinals[-1])
+
+    def to_numpy(self) -> numpy.ndarray:
+        np = _import_numpy()
+        ordinals = np.frombuffer(self._ordinals, dtype=np.intc).astype(np.int64)
+        return (ordinals - UNIX_EPOCH).astype("datetime64[D]")
+
+
+class DatePattern(DateSet):
+    """
+    A date set described by per-digit constraints on the year, month
+    and day fields, optionally filtered by weekday.
+    The matching dates are enumerated on demand and never stored.
+    """
+
+    __slots__ = (
+        "_year", "_month", "_day", "_weekday", "_length", "_values",
+        "_year_fixed", "_month_fixed", "_day_fixed", "_kinds", "_offsets",
+        "_day_runs", "_masks", "_days",
+    )
+
+    def __init__(
+        self,
+        year: tuple[int | None, ...],
+        month: tuple[int | None, ...],
+        day: tuple[int | None, ...],
+        weekday: int | None = None,
+    ):
+        """
+        Initializes a DatePattern instance.
+
+        Each field is a tuple of digits from the most significant position,
+        where None stands for a wildcard (*) digit.
+
+        :param year: The four digits of the year.
+        :param month: The two digits of the month.
+        :param day: The two digits of the day.
+        :param weekday: An optional weekday filter (0 is Monday).
+        """
+        self._year = year
+        self._month = month
+        self._day = day
+        self._weekday = weekday
+        # The number of dates and the candidate values of each field
+        # are computed on first use.
+        self._length: int | None = None
+        self._values: tuple[
+            tuple[int, ...], tuple[int, ...], tuple[int, ...]
+        ] | None = None
+        # The matching days of each kind of year and the number of dates
+        # before each candidate year, used for random access.
+        self._kinds: dict[tuple[int, int], tuple[tuple[int, ...], ...]] = {}
+        self._offsets: tuple[int, ...] | None = None
+        # The bitmap and the matching days of each kind of year,
+        # keyed like `_kinds`.
+        self._masks: dict[tuple[int, int], int] = {}
+        self._days: dict[tuple[int, int], tuple[int, ...]] = {}
+        # The runs of candidate days for each length of a month.
+        self._day_runs: dict[int, tuple[tuple[int, int], ...]] | None = None
+        # The fixed digits of each field as (place value, digit) pairs,
+        # so a date can be matched arithmetically.
+        self._year_fixed = _fixed_digits(year)
+        self._month_fixed = _fixed_digits(month)
+        self._day_fixed = _fixed_digits(day)
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, date):
+            return False
+        year, month, day = value.year, value.month, value.day
+        for place, digit in self._year_fixed:
+            if year // place % 10 != digit:
+                return False
+        for place, digit in self._month_fixed:
+            if month // place % 10 != digit:
+                return False
+        for place, digit in self._day_fixed:
+            if day // place % 10 != digit:
+                return False
+        return self._weekday is None or value.weekday() == self._weekday
+
+    def __len__(self) -> int:
+        if self._length is None:
+            self._length = self._count()
+        return self._length
+
+    @property
+    def key(self) -> Hashable:
+        # The candidate values are a normalized form of the digits,
+        # e.g. the months of "2024-*3-**" and "2024-03-**" are both (3,).
+        return (*self._candidates(), self._weekday)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Only the digits are pickled; the caches are rebuilt on demand.
+        return DatePattern, self.digits
+
+    @property
+    def digits(self) -> tuple[tuple[int | None, ...], tuple[int | None, ...],
+                              tuple[int | None, ...], int | None]:
+        """
+        Returns the digit constraints this pattern was created from.
+
+        :return: The year, month and day digits, where None stands for
+                 a wildcard (*) digit, and the weekday filter.
+        """
+        return self._year, self._month, self._day, self._weekday
+
+    @property
+    def years(self) -> tuple[int, ...]:
+        """
+        Lists the candidate years allowed by the year digits.
+
+        :return: The candidate years in ascending order.
+        """
+        return self._candidates()[0]
+
+    def to_array(self, years: Sequence[int] | None = None) -> array:
+        """
+        Materializes the ordinals of the matching dates as a compact array.
+
+        :param years: An optional subset of the candidate years,
+                      in ascending order, to materialize instead of all of them.
+        :return: An array('i') of the ascending ordinals.
+        """
+        ordinals = array("i")
+        extend = ordinals.extend
+        weekday = self._weekday
+        # Extending by whole runs keeps the loop in C.
+        segments = self._segments(reverse=False, years=years)
+        if weekday is None:
+            for start, stop in self._join(segments):
+                extend(range(start, stop))
+        else:
+            for start, stop in segments:
+                extend(range(start + (weekday - start + 1) % 7, stop, 7))
+        return ordinals
+
+    def select(self, index: int) -> int:
+        if not 0 <= index < len(self):
+            raise IndexError("Date set index out of range.")
+        years, months, _ = self._candidates()
+        # Find the year holding the date, then walk its months.
+        offsets = self._year_offsets()
+        k = bisect_right(offsets, index) - 1
+        year = years[k]
+        index -= offsets[k]
+        before_month = DAYS_BEFORE_MONTH[LEAP[year]]
+        for month, days in zip(months, self._month_days(year)):
+            if index < len(days):
+                return DAYS_BEFORE_YEAR[year] + before_month[month - 1] + days[index]
+            index -= len(days)
+        raise AssertionError("unreachable")
+
+    def rank(self, ordinal: int) -> int:
+        if ordinal < 1:
+            return 0
+        if ordinal > DAYS_BEFORE_YEAR[-1]:
+            return len(self)
+        value = date.fromordinal(ordinal)
+        years, months, _ = self._candidates()
+        k = bisect_left(years, value.year)
+        count = self._year_offsets()[k]
+        if k < len(years) and years[k] == value.year:
+            for month, days in zip(months, self._month_days(value.year)):
+                if month >= value.month:
+                    if month == value.month:
+                        count += bisect_left(days, value.day)
+                    break
+                count += len(days)
+        return count
+
+    def runs(self) -> Iterator[tuple[int, int]]:
+        if self._weekday is not None:
+            # Days of a single weekday are a week apart, so each is a run.
+            return ((o, o + 1) for o in self._ordinals(reverse=False))
+        return self._join(self._segments(reverse=False))
+
+    def reversed_runs(self) -> Iterator[tuple[int, int]]:
+        if self._weekday is not None:
+            for ordinal in self._ordinals(reverse=True):
+                yield ordinal, ordinal + 1
+            return
+        # Joining the reversed segments with swapped bounds
+        # coalesces them downwards.
+        for stop, start in self._join(
+            (-stop, -start) for start, stop in self._segments(reverse=True)
+        ):
+            yield -start, -stop
+
+    def __iter__(self) -> Iterator[date]:
+        # A run may span the whole pattern, so the dates are streamed
+        # from the matching ordinals instead of waiting for each run.
+        return map(date.fromordinal, self._ordinals(reverse=False))
+
+    @property
+    def first(self) -> date:
+        # A run may span the whole pattern,
+        # so the boundary is taken from the first matching ordinal instead.
+        for ordinal in self._ordinals(reverse=False):
+            return date.fromordinal(ordinal)
+        raise IndexError("Date set is empty.")
+
+    @property
+    def last(self) -> date:
+        for ordinal in self._ordinals(reverse=True):
+            return date.fromordinal(ordinal)
+        raise IndexError("Date set is empty.")
+
+    def to_numpy(self) -> numpy.ndarray:
+        np = _import_numpy()
+        years, months, days = (
+            np.array(field, dtype=np.int64) for field in self._candidates()
+        )
+
+        # Every (year, month) pair is a row of the grid and
+        # every candidate day a column, in ascending order.
+        leap = np.frombuffer(LEAP, dtype=np.uint8)[years][:, None]
+        before_year = np.frombuffer(DAYS_BEFORE_YEAR, dtype=np.intc)[years][:, None]
+        before_month = np.array(DAYS_BEFORE_MONTH)[leap, months - 1]
+        limit = np.array(DAYS_IN_MONTH)[leap, months - 1]
+
+        ordinals = (before_year + before_month)[:, :, None] + days
+        valid = days <= limit[:, :, None]
+        if self._weekday is not None:
+            # The ordinal 1 (0001-01-01) is a Monday.
+            valid &= (ordinals - 1) % 7 == self._weekday
+        return (ordinals[valid] - UNIX_EPOCH).astype("datetime64[D]")
+
+    def _candidates(self) -> tuple[tuple[int, ...], tuple[int, ...], tuple[int, ...]]:
+        """
+        Lists the values allowed by the digit constraints of each field.
+        The lists are computed once and reused afterwards.
+
+        :return: The candidate years, months and days in ascending order.
+        """
+        if self._values is None:
+            self._values = (
+                _expand(self._year, MIN_YEAR, MAX_YEAR),
+                _expand(self._month, 1, 12),
+                _expand(self._day, 1, 31),
+            )
+        return self._values
+
+    def _count(self) -> int:
+        """
+        Counts the matching dates arithmetically, without enumerating them.
+
+        :return: The number of dates matching the pattern.
+        """
+        years, months, days = self._candidates()
+
+        # Count the matching days for each possible length of a month,
+        # bucketed by the remainder of the day modulo 7.
+        buckets = {
+            limit: [0] * 7 for limit in (28, 29, 30, 31)
+        }
+        for limit, bucket in buckets.items():
+            for day in days:
+                if day <= limit:
+                    bucket[day % 7] += 1
+
+        if self._weekday is None:
+            # Without a weekday, a year only matters through its leap flag.
+            leap_years = sum(LEAP[year] for year in years)
+            common = sum(sum(buckets[DAYS_IN_MONTH[0][m - 1]]) for m in months)
+            leap = sum(sum(buckets[DAYS_IN_MONTH[1][m - 1]]) for m in months)
+            return common * (len(years) - leap_years) + leap * leap_years
+
+        # With a weekday, a year only matters through its leap flag and
+        # the weekday of its January 1st, so each of these 14 kinds of year
+        # is counted once and multiplied by the number of its occurrences.
+        total = 0
+        kinds = Counter((LEAP[year], JAN1_WEEKDAY[year]) for year in years)
+        for (leap, jan1), occurrences in kinds.items():
+            count = 0
+            for month in months:
+                base = jan1 + DAYS_BEFORE_MONTH[leap][month - 1]
+                # The day d falls on the weekday when
+                # (base + d - 1) % 7 == weekday.
+                bucket = buckets[DAYS_IN_MONTH[leap][month - 1]]
+                count += bucket[(self._weekday - base + 1) % 7]
+            total += count * occurrences
+        return total
+
+    def _month_days(self, year: int) -> tuple[tuple[int, ...], ...]:
+        """
+        Lists the matching days of each candidate month of a year.
+
+        The days only depend on the leap flag of the year and, with a
+        weekday filter, on the weekday of its January 1st, so they are
+        computed once for each of these kinds of year.
+
+        :param year: A candidate year.
+        :return: A tuple with the ascending matching days of each month.
+        """
+        weekday = self._weekday
+        leap = LEAP[year]
+        jan1 = 0 if weekday is None else JAN1_WEEKDAY[year]
+        rows = self._kinds.get((leap, jan1))
+        if rows is None:
+            _, months, days = self._candidates()
+            rows = tuple(
+                tuple(
+                    day for day in days
+                    if day <= DAYS_IN_MONTH[leap][month - 1] and (
+                        weekday is None or (
+                            jan1 + DAYS_BEFORE_MONTH[leap][month - 1] + day - 1
+                        ) % 7 == weekday
+                    )
+                )
+                for month in months
+            )
+            self._kinds[(leap, jan1)] = rows
+        return rows
+
+    def _year_bits(self, year: int) -> int:
+        """
+        Builds the bitmap of the matching days of a year, where bit i
+        stands for its (i + 1)-th day. Years of the same kind share it.
+
+        :param year: A candidate year.
+        :return: The bitmap of the year as an integer.
+        """
+        leap = LEAP[year]
+        kind = (leap, 0 if self._weekday is None else JAN1_WEEKDAY[year])
+        bits = self._masks.get(kind)
+        if bits is None:
+            _, months, _ = self._candidates()
+            bits = 0
+            for month, days in zip(months, self._month_days(year)):
+                before = DAYS_BEFORE_MONTH[leap][month - 1]
+                for day in days:
+                    bits |= 1 << (before + day - 1)
+            self._masks[kind] = bits
+        return bits
+
+    def _year_days(self, year: int) -> tuple[int, ...]:
+        """
+        Lists the matching days of a year by their position in the year,
+        starting from 1. Years of the same kind share the list.
+
+        :param year: A candidate year.
+        :return: The ascending positions of the matching days.
+        """
+        leap = LEAP[year]
+        kind = (leap, 0 if self._weekday is None else JAN1_WEEKDAY[year])
+        days = self._days.get(kind)
+        if days is None:
+            _, months, _ = self._candidates()
+            days = self._days[kind] = tuple(
+                DAYS_BEFORE_MONTH[leap][month - 1] + day
+                for month, row in zip(months, self._month_days(year))
+                for day in row
+            )
+        return days
+
+    def _year_offsets(self) -> tuple[int, ...]:
+        """
+        Lists the number of dates before each candidate year.
+        The list is computed once and reused afterwards.
+
+        :return: A tuple with the offset of each candidate year,
+                 followed by the number of dates.
+        """
+        if self._offsets is None:
+            years = self._candidates()[0]
+            self._offsets = tuple(accumulate(
+                (sum(map(len, self._month_days(year))) for year in years),
+                initial=0,
+            ))
+        return self._offsets
+
+    def _segments(self, reverse: bool,
+                  years: Sequence[int] | None = None) -> Iterator[tuple[int, int]]:
+        """
+        Enumerates the runs of matching days within each matching month,
+        ignoring the weekday filter.
+
+        The candidate days are split into runs of consecutive days once
+        per month length, so each month only costs a few additions
+        and no date object is ever created.
+
+        :param reverse: Whether to enumerate in descending order.
+        :param years: An optional subset of the candidate years,
+                      in ascending order, to enumerate instead of all of them.
+        :return: An iterator over (start, stop) ordinal pairs,
+                 which are not coalesced across months.
+        """
+        candidates, months, days = self._candidates()
+        if years is None:
+            years = candidates
+        if self._day_runs is None:
+            self._day_runs = {
+                limit: tuple(_coalesce((day for day in days if day <= limit), step=1))
+                for limit in (28, 29, 30, 31)
+            }
+        day_runs = self._day_runs
+        if reverse:
+            years, months = years[::-1], months[::-1]
+            day_runs = {limit: runs[::-1] for limit, runs in day_runs.items()}
+
+        for year in years:
+            # The ordinal of the last day of the previous year.
+            before_year = DAYS_BEFORE_YEAR[year]
+            before_month = DAYS_BEFORE_MONTH[LEAP[year]]
+            days_in_month = DAYS_IN_MONTH[LEAP[year]]
+            for month in months:
+                base = before_year + before_month[month - 1]
+                for first, stop in day_runs[days_in_month[month - 1]]:
+                    yield base + first, base + stop
+
+    def _ordinals(self, reverse: bool,
+                  years: Sequence[int] | None = None) -> Iterator[int]:
+        """
+        Enumerates the ordinals of every matching date.
+
+        Runs of consecutive days are enumerated as ranges. Otherwise,
+        i.e. with a weekday filter or with no two consecutive candidate
+        days, the matching days of each kind of year are listed once and
+        shifted by the ordinal before each year, so the cost is
+        proportional to the number of matching dates.
+
+        :param reverse: Whether to enumerate in descending order.
+        :param years: An optional subset of the candidate years,
+                      in ascending order, to enumerate instead of all of them.
+        :return: An iterator over ordinals.
+        """
+        candidates, _, days = self._candidates()
+        if years is None:
+            years = candidates
+        if self._weekday is not None or all(b - a > 1 for a, b in zip(days, days[1:])):
+            if reverse:
+                return chain.from_iterable(
+                    map(DAYS_BEFORE_YEAR[year].__add__, reversed(self._year_days(year)))
+                    for year in reversed(years)
+                )
+            return chain.from_iterable(
+                map(DAYS_BEFORE_YEAR[year].__add__, self._year_days(year))
+                for year in years
+            )
+
+        segments = self._segments(reverse, years)
+        if reverse:
+            return chain.from_iterable(
+                range(stop - 1, start - 1, -1) for start, stop in segments
+            )
+        return chain.from_iterable(
+            range(start, stop) for start, stop in segments
+        )
+
+    @staticmethod
+    def _join(segments: Iterable[tuple[int, int]]) -> Iterator[tuple[int, int]]:
+        """
+        Coalesces ascending segments that touch each other into runs.
+
+        :param segments: Ascending, non-overlapping (start, stop) pairs.
+        :return: An iterator over coalesced (start, stop) pairs.
+        """
+        start: int | None = None
+        stop = 0
+        for first, end in segments:
+            if start is not None and first == stop:
+                stop = end
+                continue
+            if start is not None:
+                yield start, stop
+            start, stop = first, end
+        if start is not None:
+            yield start, stop
+
+
+class DateBitmap(DateSet):
+    """
+    A date set stored as one bitmap per year, where bit i of a year
+    stands for its (i + 1)-th day and years without dates are omitted.
+
+    Bitmaps suit dense but irregular sets, e.g. unions of patterns with
+    weekday filters: set operations are bitwise operations on at most
+    366-bit integers per year and the dates are counted by popcount.
+    """
+
+    __slots__ = ("_years", "_offsets")
+
+    def __init__(self, years: dict[int, int]):
+        """
+        Initializes a DateBitmap instance.
+
+        :param years: The bitmap of each year. Empty bitmaps are dropped.
+        """
+        self._years = {year: bits for year, bits in sorted(years.items()) if bits}
+        # The years and the number of dates before each of them,
+        # computed on first use for random access.
+        self._offsets: tuple[tuple[int, ...], tuple[int, ...]] | None = None
+
+    @classmethod
+    def from_set(cls, date_set: DateSet) -> DateBitmap:
+        """
+        Converts another date set into bitmaps.
+
+        Patterns are converted a year at a time, since every year of the
+        same kind shares a bitmap; other sets are converted run by run.
+
+        :param date_set: The date set to convert.
+        :return: A DateBitmap holding the same dates.
+        """
+        if isinstance(date_set, DateBitmap):
+            return date_set
+        if isinstance(date_set, DatePattern):
+            return cls({year: date_set._year_bits(year) for year in date_set.years})
+
+        years: dict[int, int] = {}
+        for start, stop in date_set.runs():
+            while start < stop:
+                # Split the run at the end of each year.
+                year = bisect_left(DAYS_BEFORE_YEAR, start, 1) - 1
+                before = DAYS_BEFORE_YEAR[year]
+                end = min(stop, DAYS_BEFORE_YEAR[year + 1] + 1)
+                bits = ((1 << (end - start)) - 1) << (start - before - 1)
+                years[year] = years.get(year, 0) | bits
+                start = end
+        return cls(years)
+
+    @classmethod
+    def from_dates(cls, dates: Iterable[date]) -> DateBitmap:
+        """
+        Creates a date set holding the given dates.
+
+        :param dates: Date objects in any order, possibly repeated.
+        :return: A DateBitmap instance.
+        """
+        years: dict[int, int] = {}
+        for value in dates:
+            year = value.year
+            bit = 1 << (value.toordinal() - DAYS_BEFORE_YEAR[year] - 1)
+            years[year] = years.get(year, 0) | bit
+        return cls(years)
+
+    @property
+    def key(self) -> Hashable:
+        return tuple(self._years.items())
+
+    def runs(self) -> Iterator[tuple[int, int]]:
+        # Runs ending on December 31st are joined with those of the next year.
+        return DatePattern._join(
+            (DAYS_BEFORE_YEAR[year] + 1 + first, DAYS_BEFORE_YEAR[year] + 1 + stop)
+            for year, bits in self._years.items()
+            for first, stop in _bit_runs(bits)
+        )
+
+    def reversed_runs(self) -> Iterator[tuple[int, int]]:
+        return reversed(tuple(self.runs()))
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, date):
+            return False
+        bits = self._years.get(value.year, 0)
+        return bits >> (value.toordinal() - DAYS_BEFORE_YEAR[value.year] - 1) & 1 == 1
+
+    def __len__(self) -> int:
+        return sum(bits.bit_count() for bits in self._years.values())
+
+    @property
+    def first(self) -> date:
+        if not self._years:
+            raise IndexError("Date set is empty.")
+        year, bits = next(iter(self._years.items()))
+        return date.fromordinal(DAYS_BEFORE_YEAR[year] + (bits & -bits).bit_length())
+
+    @property
+    def last(self) -> date:
+        if not self._years:
+            raise IndexError("Date set is empty.")
+        year, bits = next(reversed(self._years.items()))
+        return date.fromordinal(DAYS_BEFORE_YEAR[year] + bits.bit_length())
+
+    def select(self, index: int) -> int:
+        years, offsets = self._prefix()
+        if not 0 <= index < offsets[-1]:
+            raise IndexError("Date set index out of range.")
+        k = bisect_right(offsets, index) - 1
+        bits = self._years[years[k]]
+        index -= offsets[k]
+        # Find the lowest day whose bits up to it hold index + 1 dates.
+        low, high = 0, bits.bit_length() - 1
+        while low < high:
+            middle = (low + high) // 2
+            if (bits & ((2 << middle) - 1)).bit_count() > index:
+                high = middle
+            else:
+                low = middle + 1
+        return DAYS_BEFORE_YEAR[years[k]] + low + 1
+
+    def rank(self, ordinal: int) -> int:
+        years, offsets = self._prefix()
+        if ordinal <= 1:
+            return 0
+        if ordinal > DAYS_BEFORE_YEAR[-1]:
+            return offsets[-1]
+        year = bisect_left(DAYS_BEFORE_YEAR, ordinal, 1) - 1
+        k = bisect_left(years, year)
+        count = offsets[k]
+        if k < len(years) and years[k] == year:
+            mask = (1 << (ordinal - DAYS_BEFORE_YEAR[year] - 1)) - 1
+            count += (self._years[year] & mask).bit_count()
+        return count
+
+    def _prefix(self) -> tuple[tuple[int, ...], tuple[int, ...]]:
+        """
+        Lists the years and the number of dates before each of them.
+        The lists are computed once and reused afterwards.
+
+        :return: The ascending years, and the number of dates before each
+                 year followed by the total number of dates.
+        """
+        if self._offsets is None:
+            self._offsets = (tuple(self._years), tuple(accumulate(
+                (bits.bit_count() for bits in self._years.values()), initial=0
+            )))
+        return self._offsets
+
+    def union(self, other: DateSet) -> DateBitmap:
+        years = dict(self._years)
+        for year, bits in DateBitmap.from_set(other)._years.items():
+            years[year] = years.get(year, 0) | bits
+        return DateBitmap(years)
+
+    def intersection(self, other: DateSet) -> DateBitmap:
+        mine = self._years
+        return DateBitmap({
+            year: mine[year] & bits
+            for year, bits in DateBitmap.from_set(other)._years.items()
+            if year in mine
+        })
+
+    def difference(self, other: DateSet) -> DateBitmap:
+        theirs = DateBitmap.from_set(other)._years
+        return DateBitmap({
+            year: bits & ~theirs.get(year, 0) for year, bits in self._years.items()
+        })
+
+    def symmetric_difference(self, other: DateSet) -> DateBitmap:
+        years = dict(self._years)
+        for year, bits in DateBitmap.from_set(other)._years.items():
+            years[year] = years.get(year, 0) ^ bits
+        return DateBitmap(years)
+
+
+def _bit_runs(bits: int) -> Iterator[tuple[int, int]]:
+    """
+    Lists the runs of consecutive set bits of an integer.
+
+    :param bits: A non-negative integer.
+    :return: An iterator over ascending (first, one past last) bit positions.
+    """
+    while bits:
+        first = (bits & -bits).bit_length() - 1
+        shifted = bits >> first
+        # The number of trailing ones of the shifted bits.
+        length = (~shifted & (shifted + 1)).bit_length() - 1
+        yield first, first + length
+        bits &= ~(((1 << length) - 1) << first)
+
+
+def _coalesce(ordinals: Iterable[int], step: int) -> Iterator[tuple[int, int]]:
+    """
+    Groups consecutive ordinals into runs.
+
+    :param ordinals: Ordinals in ascending (step=1) or
+                     descending (step=-1) order.
+    :param step: The distance between two consecutive ordinals of a run.
+    :return: An iterator over (first, one past last) ordinal pairs.
+    """
+    start: int | None = None
+    stop = 0
+    for ordinal in ordinals:
+        if start is not None and ordinal == stop:
+            stop += step
+            continue
+        if start is not None:
+            yield start, stop
+        start, stop = ordinal, ordinal + step
+    if start is not None:
+        yield start, stop
+
+
+def _boundaries(runs: Iterator[tuple[int, int]]) -> Iterator[int]:
+    """
+    Flattens runs into the ordinals where membership toggles.
+
+    :param runs: Ascending, non-adjacent (start, stop) ordinal pairs.
+    :return: An iterator over strictly increasing ordinals.
+    """
+    for start, stop in runs:
+        yield start
+        yield stop
+
+
+def _import_numpy() -> Any:
+    """
+    Imports NumPy, which is an optional dependency.
+
+    :return: The numpy module.
+    :raises ImportError: If NumPy is not installed.
+    """
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            "NumPy is required for this feature. "
+            "Install it with 'pip install expressdate[numpy]'."
+        ) from e
+    return numpy
+
+
+def _expand_runs(np: Any, runs: Iterator[tuple[int, int]]) -> numpy.ndarray:
+    """
+    Expands runs into a numpy.datetime64[D] array with a single allocation.
+
+    :param np: The numpy module.
+    :param runs: Ascending (start, stop) ordinal pairs.
+    :return: A one-dimensional array of every date within the runs.
+    """
+    bounds = np.fromiter(chain.from_iterable(runs), dtype=np.int64)
+    starts, stops = bounds[0::2], bounds[1::2]
+    lengths = stops - starts
+    # Each element is its index shifted by the distance between
+    # the start of its run and the position of the run in the output.
+    shifts = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    shifts += np.arange(shifts.size, dtype=np.int64) - UNIX_EPOCH
+    return shifts.astype("datetime64[D]")
+
+
+def _fixed_digits(mask: tuple[int | None, ...]) -> tuple[tuple[int, int], ...]:
+    """
+    Lists the fixed (non-wildcard) digits of a mask with their place values.
+
+    :param mask: Digits from the most significant position,
+                 where None stands for any digit.
+    :return: A tuple of (place value, digit) pairs.
+    """
+    size = len(mask)
+    return tuple(
+        (10 ** (size - 1 - i), digit)
+        for i, digit in enumerate(mask) if digit is not None
+    )
+
+
+@lru_cache(maxsize=256)
+def _expand(mask: tuple[int | None, ...], low: int, high: int) -> tuple[int, ...]:
+    """
+    Lists every integer within the bounds whose digits match the mask.
+    The lists are shared, so patterns with the same year or month digits,
+    e.g. within a batch, only expand them once.
+
+    :param mask: Digits from the most significant position,
+                 where None stands for any digit.
+    :param low: The smallest acceptable value.
+    :param high: The largest acceptable value.
+    :return: The matching integers in ascending order.
+    """
+    options = [range(10) if digit is None else (digit,) for digit in mask]
+    values = []
+    for digits in product(*options):
+        value = 0
+        for digit in digits:
+            value = value * 10 + digit
+        if low <= value <= high:
+            values.append(value)
+    return tuple(values)
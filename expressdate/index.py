@@ -0,0 +1,288 @@
+from __future__ import annotations
+from bisect import bisect_left, bisect_right
+from datetime import date, tzinfo
+from typing import Hashable, Iterator, Mapping
+from . import clock
+from .compiled import CompiledExpr
+from .parse import ExpressDateParser
+
+__all__ = ["ExpressDateIndex"]
+
+# The number of digits of a date in YYYYMMDD form.
+DIGITS = 8
+
+
+def _buckets(
+    entries: list[tuple[int, int, Hashable]]
+) -> list[tuple[int, list[int], list[Hashable]]]:
+    """
+    Groups ranges with one relative term by the offset of that term.
+
+    :param entries: (offset, ordinal, key) triples, where the ordinal is
+                    the absolute term of each range.
+    :return: (offset, ordinals, keys) triples in ascending order of offset,
+             where the ordinals are ascending and the keys match them.
+    """
+    buckets: dict[int, list[tuple[int, Hashable]]] = {}
+    for offset, ordinal, key in entries:
+        buckets.setdefault(offset, []).append((ordinal, key))
+    result = []
+    for offset in sorted(buckets):
+        items = sorted(buckets[offset], key=lambda item: item[0])
+        result.append((offset, [o for o, _ in items], [k for _, k in items]))
+    return result
+
+
+class _IntervalTree:
+    """
+    A static, centered interval tree answering which closed intervals
+    contain a point in O(log n + k) time, where k is the number of matches.
+    """
+
+    __slots__ = ("_center", "_by_start", "_by_stop", "_left", "_right")
+
+    def __init__(self, intervals: list[tuple[int, int, Hashable]]):
+        """
+        Initializes an _IntervalTree instance.
+
+        :param intervals: Non-empty (start, stop, key) triples,
+                          where the bounds are inclusive.
+        """
+        # The median start splits the intervals into halves of similar size.
+        starts = sorted(start for start, _, _ in intervals)
+        center = self._center = starts[len(starts) // 2]
+        left = [i for i in intervals if i[1] < center]
+        right = [i for i in intervals if i[0] > center]
+        here = [i for i in intervals if i[0] <= center <= i[1]]
+        # The intervals containing the center are scanned from their
+        # nearest bounds, so the scan stops at the first miss.
+        self._by_start = sorted(here, key=lambda i: i[0])
+        self._by_stop = sorted(here, key=lambda i: -i[1])
+        self._left = _IntervalTree(left) if left else None
+        self._right = _IntervalTree(right) if right else None
+
+    def stab(self, point: int) -> Iterator[Hashable]:
+        """
+        Finds the intervals containing a point.
+
+        :param point: The point to look up.
+        :return: An iterator over the keys of the matching intervals.
+        """
+        node: _IntervalTree | None = self
+        while node is not None:
+            if point < node._center:
+                for start, _, key in node._by_start:
+                    if start > point:
+                        break
+                    yield key
+                node = node._left
+            elif point > node._center:
+                for _, stop, key in node._by_stop:
+                    if stop < point:
+                        break
+                    yield key
+                node = node._right
+            else:
+                for _, _, key in node._by_start:
+                    yield key
+                return
+
+
+class ExpressDateIndex:
+    """
+    An index over many keyed date expressions, answering which of them
+    contain a given date without evaluating each expression.
+
+    Wildcard expressions are stored in a trie over the digits of YYYYMMDD,
+    where a wildcard is an edge of its own, with a bucket per weekday at
+    each leaf; a lookup only follows the digits of the date and the
+    wildcard edges. Exact dates and ranges are stored in an interval tree
+    over ordinals, and ranges relative to 'today' in an interval tree
+    over offsets from 'today', so they are resolved once per lookup.
+    Ranges with one relative term, e.g. "2024-08-10 ~", are grouped by
+    the offset of that term and sorted by their absolute term.
+    """
+
+    def __init__(self, exprs: Mapping[Hashable, str | CompiledExpr] | None = None):
+        """
+        Initializes an ExpressDateIndex instance.
+
+        :param exprs: An optional mapping of keys to their expressions.
+        :raises ValueError: If any expression is invalid.
+        """
+        self._exprs: dict[Hashable, CompiledExpr] = {}
+        # The lookup structures are rebuilt on the first lookup after a change.
+        self._trie: dict = {}
+        self._absolute: _IntervalTree | None = None
+        self._relative: _IntervalTree | None = None
+        # Ranges with an absolute start and a relative end, and vice versa.
+        self._relative_ends: list[tuple[int, list[int], list[Hashable]]] = []
+        self._relative_starts: list[tuple[int, list[int], list[Hashable]]] = []
+        self._dirty = False
+        for key, expr in (exprs or {}).items():
+            self.add(key, expr)
+
+    def __len__(self) -> int:
+        """
+        Provides the number of indexed expressions.
+
+        :return: The number of keys in the index.
+        """
+        return len(self._exprs)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """
+        Checks whether a key is indexed.
+
+        :param key: The key to look up.
+        :return: True if the key has an expression, otherwise False.
+        """
+        return key in self._exprs
+
+    def __getitem__(self, key: Hashable) -> CompiledExpr:
+        """
+        Retrieves the expression of a key.
+
+        :param key: The key to look up.
+        :return: The compiled expression of the key.
+        :raises KeyError: If the key is not indexed.
+        """
+        return self._exprs[key]
+
+    def add(self, key: Hashable, expr: str | CompiledExpr) -> None:
+        """
+        Indexes an expression under a key, replacing any previous one.
+
+        Expressions are compiled without the process-wide cache,
+        so a large index does not evict the entries of other callers.
+
+        :param key: A hashable key identifying the expression.
+        :param expr: A date expression or a compiled expression.
+        :raises ValueError: If the expression is invalid, or if it is
+                            a range relative to 'today' in the wrong order.
+        """
+        if isinstance(expr, str):
+            expr = ExpressDateParser.compile(expr, cache=False)
+        terms = expr.terms
+        if terms is not None and isinstance(terms[0], int) and \
+                isinstance(terms[1], int) and terms[0] > terms[1]:
+            raise ValueError("Invalid date range.")
+        self._exprs[key] = expr
+        self._dirty = True
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Removes the expression of a key from the index.
+
+        :param key: The key to remove.
+        :raises KeyError: If the key is not indexed.
+        """
+        del self._exprs[key]
+        self._dirty = True
+
+    def matching(self, value: date, tz: tzinfo | None = None,
+                 today: date | None = None) -> list[Hashable]:
+        """
+        Finds the keys whose expressions contain a date, in time roughly
+        proportional to the number of matches rather than of expressions.
+
+        :param value: The date to look up.
+        :param tz: An optional timezone, used for determining 'today'.
+        :param today: An optional date used as 'today' instead of the clock
+                      or the date pinned by `clock.frozen`.
+        :return: A list of the matching keys, in no particular order.
+        """
+        if self._dirty:
+            self._build()
+        keys = self._match_trie(value)
+        ordinal = value.toordinal()
+        if self._absolute is not None:
+            keys.extend(self._absolute.stab(ordinal))
+        if self._relative is None and not self._relative_ends and \
+                not self._relative_starts:
+            return keys
+
+        # 'today' is only read when some range depends on it.
+        if today is None:
+            today = clock.today(tz)
+        offset = ordinal - today.toordinal()
+        if self._relative is not None:
+            keys.extend(self._relative.stab(offset))
+        # Within each bucket, the matching ranges are a prefix or a suffix.
+        # Ranges resolved in the wrong order never match.
+        for end, starts, bucket in reversed(self._relative_ends):
+            if end < offset:
+                break
+            keys.extend(bucket[:bisect_right(starts, ordinal)])
+        for start, stops, bucket in self._relative_starts:
+            if start > offset:
+                break
+            keys.extend(bucket[bisect_left(stops, ordinal):])
+        return keys
+
+    def _match_trie(self, value: date) -> list[Hashable]:
+        """
+        Finds the wildcard expressions containing a date.
+
+        :param value: The date to look up.
+        :return: A list of the matching keys.
+        """
+        year, month, day = value.year, value.month, value.day
+        digits = (
+            year // 1000, year // 100 % 10, year // 10 % 10, year % 10,
+            month // 10, month % 10, day // 10, day % 10,
+        )
+        # Follow both the edge of the digit and the wildcard edge.
+        nodes = [self._trie]
+        for digit in digits:
+            children = []
+            for node in nodes:
+                if (child := node.get(digit)) is not None:
+                    children.append(child)
+                if (child := node.get(None)) is not None:
+                    children.append(child)
+            if not children:
+                return []
+            nodes = children
+
+        weekday = value.weekday()
+        keys = []
+        for buckets in nodes:
+            keys.extend(buckets.get(weekday, ()))
+            keys.extend(buckets.get(None, ()))
+        return keys
+
+    def _build(self) -> None:
+        """
+        Rebuilds the lookup structures from the indexed expressions.
+        """
+        trie: dict = {}
+        absolute = []
+        relative = []
+        relative_ends: list[tuple[int, int, Hashable]] = []
+        relative_starts: list[tuple[int, int, Hashable]] = []
+        for key, expr in self._exprs.items():
+            if (pattern := expr.pattern) is not None:
+                year, month, day, weekday = pattern.digits
+                node = trie
+                for digit in (*year, *month, *day):
+                    node = node.setdefault(digit, {})
+                node.setdefault(weekday, []).append(key)
+                continue
+
+            left, right = expr.terms  # type: ignore
+            if isinstance(left, date) and isinstance(right, date):
+                absolute.append((left.toordinal(), right.toordinal(), key))
+            elif isinstance(left, int) and isinstance(right, int):
+                relative.append((left, right, key))
+            elif isinstance(left, date) and isinstance(right, int):
+                relative_ends.append((right, left.toordinal(), key))
+            elif isinstance(left, int) and isinstance(right, date):
+                relative_starts.append((left, right.toordinal(), key))
+
+        self._trie = trie
+        self._absolute = _IntervalTree(absolute) if absolute else None
+        self._relative = _IntervalTree(relative) if relative else None
+        self._relative_ends = _buckets(relative_ends)
+        self._relative_starts = _buckets(relative_starts)
+        self._dirty = False
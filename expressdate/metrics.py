@@ -0,0 +1,219 @@
+from __future__ import annotations
+import logging
+from heapq import heappush, heappushpop
+from itertools import count as counter
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Literal, NamedTuple
+
+__all__ = ["Event", "Metrics", "Phase", "metrics"]
+
+logger = logging.getLogger(__name__)
+
+Phase = Literal["lex", "resolve", "expand", "operate"]
+
+# The phases that are timed, in the order they happen.
+PHASES: tuple[Phase, ...] = ("lex", "resolve", "expand", "operate")
+
+
+class Event(NamedTuple):
+    """
+    A single timed phase of parsing or evaluating an expression.
+    """
+
+    expr: str
+    phase: Phase
+    seconds: float
+    dates: int | None
+
+
+class _Timer:
+    """
+    Times the body of a `with` block and records it as an event.
+    The number of generated dates may be set through `count`.
+    """
+
+    __slots__ = ("_metrics", "_expr", "_phase", "_start", "count")
+
+    def __init__(self, metrics: Metrics, expr: str, phase: Phase):
+        self._metrics = metrics
+        self._expr = expr
+        self._phase: Phase = phase
+        self.count: int | None = None
+
+    def __enter__(self) -> _Timer:
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, *_: Any) -> None:
+        # Failed phases are not recorded.
+        if exc_type is None:
+            self._metrics.record(Event(
+                self._expr, self._phase, perf_counter() - self._start, self.count
+            ))
+
+
+class _NullTimer:
+    """
+    A timer that does nothing, used while the metrics are disabled.
+    """
+
+    # The count of the shared disabled timer is simply overwritten.
+    __slots__ = ("count",)
+
+    def __init__(self) -> None:
+        self.count: int | None = None
+
+    def __enter__(self) -> _NullTimer:
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """
+    Opt-in counters and timers for parsing and expanding expressions.
+
+    While disabled, which is the default, timing a phase costs a single
+    attribute check. Once enabled, every phase is recorded: the number
+    of calls and the time spent per phase, the number of generated dates,
+    and the slowest events, which are also passed to the callbacks.
+    """
+
+    def __init__(self, top: int = 10):
+        """
+        Initializes a Metrics instance.
+
+        :param top: The number of slowest events to keep.
+        :raises ValueError: If the number of events is negative.
+        """
+        if top < 0:
+            raise ValueError("Invalid number of events.")
+        self.enabled = False
+        self._top = top
+        self._lock = Lock()
+        self._callbacks: list[Callable[[Event], Any]] = []
+        self._sequence = counter()
+        self.reset()
+
+    def enable(self) -> None:
+        """
+        Starts recording events.
+        """
+        self.enabled = True
+
+    def disable(self) -> None:
+        """
+        Stops recording events. The recorded statistics are kept.
+        """
+        self.enabled = False
+
+    def reset(self) -> None:
+        """
+        Discards the recorded statistics.
+        """
+        with self._lock:
+            self._calls = dict.fromkeys(PHASES, 0)
+            self._seconds = dict.fromkeys(PHASES, 0.0)
+            self._max = dict.fromkeys(PHASES, 0.0)
+            self._dates = 0
+            self._slowest: list[tuple[float, int, Event]] = []
+
+    def add_callback(self, callback: Callable[[Event], Any]) -> None:
+        """
+        Registers a function that is called with every recorded event,
+        e.g. to forward the events to a metrics exporter.
+
+        :param callback: A function taking an Event.
+        """
+        with self._lock:
+            self._callbacks = [*self._callbacks, callback]
+
+    def remove_callback(self, callback: Callable[[Event], Any]) -> None:
+        """
+        Unregisters a function added with `add_callback`.
+
+        :param callback: The function to remove.
+        :raises ValueError: If the function is not registered.
+        """
+        with self._lock:
+            callbacks = list(self._callbacks)
+            callbacks.remove(callback)
+            self._callbacks = callbacks
+
+    def timer(self, expr: str | None, phase: Phase) -> _Timer | _NullTimer:
+        """
+        Times a phase of an expression in a `with` block.
+
+        :param expr: The expression being processed.
+        :param phase: One of "lex", "resolve", "expand" or "operate".
+        :return: A context manager whose `count` attribute may be set
+                 to the number of generated dates.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, "<set>" if expr is None else expr, phase)
+
+    def record(self, event: Event) -> None:
+        """
+        Records an event and passes it to the callbacks.
+
+        Callbacks run within the timed operations, so an exception raised
+        by one of them is logged and dropped instead of breaking parsing.
+
+        :param event: The event to record.
+        """
+        with self._lock:
+            self._calls[event.phase] += 1
+            self._seconds[event.phase] += event.seconds
+            if event.seconds > self._max[event.phase]:
+                self._max[event.phase] = event.seconds
+            if event.dates is not None:
+                self._dates += event.dates
+            # A min-heap of the slowest events; the sequence breaks ties.
+            if self._top:
+                item = (event.seconds, next(self._sequence), event)
+                if len(self._slowest) < self._top:
+                    heappush(self._slowest, item)
+                else:
+                    heappushpop(self._slowest, item)
+            callbacks = self._callbacks
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("Metrics callback %r failed.", callback)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Reports the recorded statistics.
+
+        :return: A dictionary with the calls, total and maximum seconds
+                 per phase, the number of generated dates, and
+                 the slowest events, slowest first.
+        """
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "phases": {
+                    phase: {
+                        "calls": self._calls[phase],
+                        "seconds": self._seconds[phase],
+                        "max": self._max[phase],
+                    }
+                    for phase in PHASES
+                },
+                "dates": self._dates,
+                "slowest": [
+                    event._asdict()
+                    for _, _, event in sorted(self._slowest, reverse=True)
+                ],
+            }
+
+
+# The process-wide instance used by the parser and ExpressDate.
+metrics = Metrics()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import tzinfo
+from os import cpu_count
+from .dateset import DateArray, DatePattern, DateSet
+from .parse import ExpressDateParser
+
+__all__ = ["expand"]
+
+# The number of partitions per worker, so that faster workers
+# pick up the remaining partitions instead of waiting.
+PARTITIONS_PER_WORKER = 4
+# Patterns with fewer candidate years are expanded in the calling process.
+MIN_YEARS = 8
+
+
+def _expand_years(pattern: DatePattern, years: tuple[int, ...]) -> bytes:
+    """
+    Expands the dates of a pattern within some of its years.
+    This runs in a worker, and the result is sent back as raw ordinals.
+
+    :param pattern: The pattern to expand.
+    :param years: Ascending candidate years of the pattern.
+    :return: The bytes of an array('i') of the ascending ordinals.
+    """
+    return pattern.to_array(years).tobytes()
+
+
+def _partition(years: tuple[int, ...], parts: int) -> list[tuple[int, ...]]:
+    """
+    Splits the candidate years into contiguous, nearly equal partitions.
+
+    :param years: Ascending candidate years.
+    :param parts: The number of partitions.
+    :return: The partitions in ascending order.
+    """
+    size, extra = divmod(len(years), parts)
+    partitions = []
+    start = 0
+    for i in range(parts):
+        stop = start + size + (i < extra)
+        partitions.append(years[start:stop])
+        start = stop
+    return partitions
+
+
+def expand(
+    expr: str | DateSet,
+    workers: int | None = None,
+    executor: Executor | None = None,
+    tz: tzinfo | None = None,
+) -> DateArray:
+    """
+    Materializes the ordinals of an expression, expanding wildcard
+    expressions in parallel.
+
+    The candidate years of a wildcard expression are partitioned into
+    contiguous groups which are expanded by a pool of workers, and the
+    ordinals come back as compact arrays rather than pickled dates,
+    so they are merged in order by simple concatenation.
+    Ranges and small expressions are expanded in the calling process.
+
+    The result is meant to stay compact, e.g. with `DateArray.to_numpy`;
+    turning it into date objects runs serially in the calling process
+    and costs about as much as a sequential parse.
+
+    :param expr: A date expression or a date set to expand.
+    :param workers: The number of worker processes, which also sizes
+                    the partitions. Defaults to the number of CPUs.
+    :param executor: An optional executor to run the partitions on,
+                     e.g. an existing process or thread pool.
+    :param tz: An optional timezone, used for determining 'today'.
+    :return: A DateArray holding the ordinals of every date.
+    :raises ValueError: If the expression is invalid or
+                        the number of workers is not positive.
+    """
+    if workers is not None and workers < 1:
+        raise ValueError("Invalid number of workers.")
+    date_set = ExpressDateParser.parse_set(expr, tz) if isinstance(expr, str) else expr
+    if not isinstance(date_set, DatePattern):
+        return DateArray.from_set(date_set)
+
+    years = date_set.years
+    workers = workers or cpu_count() or 1
+    if (executor is None and workers == 1) or len(years) < MIN_YEARS:
+        return DateArray(date_set.to_array())
+
+    partitions = _partition(years, min(len(years), workers * PARTITIONS_PER_WORKER))
+    patterns = [date_set] * len(partitions)
+    ordinals = array("i")
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk in pool.map(_expand_years, patterns, partitions):
+                ordinals.frombytes(chunk)
+    else:
+        for chunk in executor.map(_expand_years, patterns, partitions):
+            ordinals.frombytes(chunk)
+    return DateArray(ordinals)
+
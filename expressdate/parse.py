@@ -1,6 +1,45 @@
 from datetime import date, datetime, timedelta, tzinfo
+from . import clock
+from typing import Hashable, Iterable, Iterator
+from .cache import LRUCache
+from .compiled import CompiledExpr
+from .dateset import DatePattern, DateRuns, DateSet
+from .metrics import metrics
+
+__all__ = ["ExpansionLimitError", "ExpressDateParser"]
+
+# Weekday names accepted after the comma of a wildcard expression.
+WEEKDAYS = {
+    "mon": 0,
+    "tue": 1,
+    "wed": 2,
+    "thu": 3,
+    "fri": 4,
+    "sat": 5,
+    "sun": 6,
+}
+
+
+class ExpansionLimitError(ValueError):
+    """
+    Raised when an expression describes more dates than allowed,
+    before any of them is generated.
+    """
 
-__all__ = ["ExpressDateParser"]
+    def __init__(self, expr: str, size: int, limit: int):
+        """
+        Initializes an ExpansionLimitError instance.
+
+        :param expr: The expression that exceeded the limit.
+        :param size: The number of dates the expression describes.
+        :param limit: The maximum number of dates allowed.
+        """
+        super().__init__(
+            f"'{expr}' describes {size} dates, more than the limit of {limit}."
+        )
+        self.expr = expr
+        self.size = size
+        self.limit = limit
 
 
 class ExpressDateParser:
@@ -11,8 +50,13 @@ class ExpressDateParser:
     handle wildcard characters (*), and optionally filter by weekday.
     """
 
+    # Process-wide cache of compiled expressions, keyed by the expression.
+    cache = LRUCache(maxsize=1024)
+
     @classmethod
-    def parse(cls, expr: str, tz: tzinfo | None = None) -> tuple[date, ...]:
+    def parse(
+        cls, expr: str, tz: tzinfo | None = None, max_dates: int | None = None
+    ) -> tuple[date, ...]:
         """
         Parse a date or date range expression.
 
@@ -27,84 +71,263 @@ class ExpressDateParser:
                      or a date range.
         :param tz: An optional timezone, used for determining 'today' 
                    if one side of the range is missing.
+        :param max_dates: An optional maximum number of dates to generate.
         :return: A tuple of date objects parsed from the expression.
         :raises ValueError: If the expression is invalid or 
                             the date range is incorrect.
+        :raises ExpansionLimitError: If the expression describes
+                                     more than `max_dates` dates.
+        """
+        date_set = cls.parse_set(expr, tz)
+        cls.check_limit(expr, date_set, max_dates)
+        # Skip the timer entirely on this hot path unless it is enabled.
+        if not metrics.enabled:
+            return tuple(date_set)
+        with metrics.timer(expr, "expand") as timer:
+            dates = tuple(date_set)
+            timer.count = len(dates)
+        return dates
+
+    @classmethod
+    def parse_set(cls, expr: str, tz: tzinfo | None = None) -> DateSet:
+        """
+        Parse a date or date range expression into a compact date set.
+
+        Unlike `parse`, this method does not expand the expression.
+        Ranges and single dates are represented by ordinal runs and
+        wildcard expressions by their digit constraints, so the dates
+        are only generated when the set is iterated.
+
+        :param expr: A string representing a date (with optional wildcards) 
+                     or a date range.
+        :param tz: An optional timezone, used for determining 'today' 
+                   if one side of the range is missing.
+        :return: A DateSet describing the dates of the expression.
+        :raises ValueError: If the expression is invalid or 
+                            the date range is incorrect.
+        """
+        return cls.compile(expr).evaluate(tz)
+
+    @classmethod
+    def estimate(cls, expr: str, tz: tzinfo | None = None) -> int:
+        """
+        Count the dates of a date or date range expression without
+        generating them, e.g. to reject expensive user input up front.
+
+        The count is exact: ranges are measured by their endpoints and
+        wildcard expressions are counted arithmetically, so even
+        "****-**-**" is counted in milliseconds.
+
+        :param expr: A string representing a date (with optional wildcards) 
+                     or a date range.
+        :param tz: An optional timezone, used for determining 'today' 
+                   if one side of the range is missing.
+        :return: The number of dates described by the expression.
+        :raises ValueError: If the expression is invalid or 
+                            the date range is incorrect.
+        """
+        return len(cls.parse_set(expr, tz))
+
+    @staticmethod
+    def check_limit(expr: str, date_set: DateSet, max_dates: int | None) -> None:
+        """
+        Check that a date set can be expanded within a budget.
+
+        :param expr: The expression of the date set, used in the error.
+        :param date_set: The date set about to be expanded.
+        :param max_dates: The maximum number of dates, or None for no limit.
+        :raises ExpansionLimitError: If the date set holds
+                                     more than `max_dates` dates.
+        """
+        if max_dates is not None and (size := len(date_set)) > max_dates:
+            raise ExpansionLimitError(expr, size, max_dates)
+
+    @classmethod
+    def iter_parse(cls, expr: str, tz: tzinfo | None = None) -> Iterator[date]:
+        """
+        Parse a date or date range expression and 
+        stream its dates in ascending order.
+
+        The expression is validated immediately, but the dates are generated
+        one at a time, so even "****-**-**" is streamed in constant memory.
+
+        :param expr: A string representing a date (with optional wildcards) 
+                     or a date range.
+        :param tz: An optional timezone, used for determining 'today' 
+                   if one side of the range is missing.
+        :return: An iterator over the date objects of the expression.
+        :raises ValueError: If the expression is invalid or 
+                            the date range is incorrect.
+        """
+        return iter(cls.parse_set(expr, tz))
+
+    @classmethod
+    def parse_many(
+        cls, exprs: Iterable[str], tz: tzinfo | None = None,
+        max_dates: int | None = None
+    ) -> list[tuple[date, ...]]:
+        """
+        Parse many date expressions at once.
+
+        The clock is read only once for the whole batch, so every relative
+        expression is resolved against the same 'today'. Repeated expressions
+        are parsed once, and expressions that describe the same dates
+        (e.g., "2024-08-1*" and "08-1*-2024") share a single expansion.
+        Patterns with the same year or month digits (e.g., "20**-08-1*" and
+        "20**-08-2*") share the candidate years and months of those fields.
+
+        :param exprs: The expressions to parse.
+        :param tz: An optional timezone, used for determining 'today'.
+        :param max_dates: An optional maximum number of dates
+                          to generate per expression.
+        :return: A list with a tuple of date objects for each expression,
+                 in the order of the input.
+        :raises ValueError: If any expression is invalid or 
+                            any date range is incorrect.
+        :raises ExpansionLimitError: If any expression describes
+                                     more than `max_dates` dates.
         """
-        # If the expression does not contain a tilde (~), 
-        # treat it as a single date.
-        if "~" not in expr:
-            return cls.parse_date(expr)
-
-        # Handle date range expressions like "2023-01-01 ~ 2023-01-10".
-        tilde_pos = expr.find("~")
-        left = expr[:tilde_pos].strip()
-        right = expr[tilde_pos + 1:].strip()
-        today = datetime.now(tz=tz).date()  # Use today's date if needed.
-
-        # If the right side is empty, assume the range ends at 'today'.
-        if right == "" and left:
-            return cls.parse_date_range(cls.parse_var_date(left), today)
-
-        # If both sides are specified, 
-        # parse them and generate the full date range.
-        elif left and right:
-            return cls.parse_date_range(
-                cls.parse_var_date(left),
-                cls.parse_var_date(right)
-            )
-
-        # Raise an error if the expression is invalid 
-        # (e.g., "~something" or "something~" with no data).
-        raise ValueError("Invalid date expression.")
+        today = clock.today(tz)
+        by_expr: dict[str, tuple[date, ...]] = {}
+        by_key: dict[Hashable, tuple[date, ...]] = {}
+        results = []
+        for expr in exprs:
+            dates = by_expr.get(expr)
+            if dates is None:
+                date_set = cls.compile(expr).evaluate(tz, today)
+                cls.check_limit(expr, date_set, max_dates)
+                dates = by_key.get(date_set.key)
+                if dates is None:
+                    with metrics.timer(expr, "expand") as timer:
+                        dates = by_key[date_set.key] = tuple(date_set)
+                        timer.count = len(dates)
+                by_expr[expr] = dates
+            results.append(dates)
+        return results
 
     @classmethod
-    def parse_date_range(cls, left: date, right: date) -> tuple[date, ...]:
+    def compile(cls, expr: str, cache: bool = True) -> CompiledExpr:
+        """
+        Compile a date or date range expression for repeated evaluation.
+
+        Compiled expressions are kept in the process-wide `cache`,
+        keyed by the expression string. Relative terms such as 'today'
+        or '+3' are stored as offsets and resolved on every evaluation,
+        so a cached expression never goes stale.
+
+        :param expr: A string representing a date (with optional wildcards) 
+                     or a date range.
+        :param cache: Whether to look up and store the result in the cache.
+        :return: A CompiledExpr for the expression.
+        :raises ValueError: If the expression is invalid or 
+                            the date range is incorrect.
+        """
+        if cache and (compiled := cls.cache.get(expr)) is not None:
+            return compiled
+
+        with metrics.timer(expr, "lex"):
+            # If the expression does not contain a tilde (~), 
+            # treat it as a single date.
+            if "~" not in expr:
+                if "*" in expr:
+                    compiled = CompiledExpr(expr, pattern=cls.parse_pattern(expr))
+                else:
+                    term = cls.parse_var_term(expr)
+                    compiled = CompiledExpr(expr, left=term, right=term)
+            else:
+                # Handle date range expressions like "2023-01-01 ~ 2023-01-10".
+                tilde_pos = expr.find("~")
+                left = expr[:tilde_pos].strip()
+                right = expr[tilde_pos + 1:].strip()
+
+                # If the right side is empty, assume the range ends at 'today'.
+                if right == "" and left:
+                    compiled = CompiledExpr(
+                        expr, left=cls.parse_var_term(left), right=0
+                    )
+
+                # If both sides are specified, parse them both.
+                elif left and right:
+                    compiled = CompiledExpr(
+                        expr,
+                        left=cls.parse_var_term(left),
+                        right=cls.parse_var_term(right)
+                    )
+
+                # Raise an error if the expression is invalid 
+                # (e.g., "~something" or "something~" with no data).
+                else:
+                    raise ValueError("Invalid date expression.")
+
+        if cache:
+            cls.cache.put(expr, compiled)
+        return compiled
+
+    @classmethod
+    def parse_date_range(
+        cls, left: date, right: date, max_dates: int | None = None
+    ) -> tuple[date, ...]:
         """
         Generate a list of date objects from the left date 
         to the right date (inclusive).
 
         :param left: The starting date of the range.
         :param right: The ending date of the range.
+        :param max_dates: An optional maximum number of dates to generate.
         :return: A tuple of date objects covering 
                  the entire range from 'left' to 'right'.
         :raises ValueError: If the left date is greater than the right date.
+        :raises ExpansionLimitError: If the range holds
+                                     more than `max_dates` dates.
         """
-        if left > right:
-            raise ValueError("Invalid date range.")
+        date_set = DateRuns.from_range(left, right)
+        cls.check_limit(f"{left} ~ {right}", date_set, max_dates)
+        return tuple(date_set)
 
-        dates = []
-        current = left
-        # Iterate day by day from 'left' up to 'right'.
-        while current <= right:
-            dates.append(current)
-            current += timedelta(days=1)
+    @classmethod
+    def iter_date_range(cls, left: date, right: date) -> Iterator[date]:
+        """
+        Stream date objects from the left date
+        to the right date (inclusive) in constant memory.
 
-        return tuple(dates)
+        :param left: The starting date of the range.
+        :param right: The ending date of the range.
+        :return: An iterator over the dates from 'left' to 'right'.
+        :raises ValueError: If the left date is greater than the right date.
+        """
+        return iter(DateRuns.from_range(left, right))
 
     @classmethod
-    def parse_date(cls, expr: str) -> tuple[date, ...]:
+    def parse_date(
+        cls, expr: str, max_dates: int | None = None, tz: tzinfo | None = None
+    ) -> tuple[date, ...]:
         """
         Parse a single date expression, 
         which may contain wildcard characters (*).
 
         :param expr: A string representing a single date or 
                      a wildcard expression (e.g., "2023-*1-01").
+        :param max_dates: An optional maximum number of dates to generate.
+        :param tz: An optional timezone, used for determining 'today'.
         :return: A tuple of date objects.
                  In most cases, this will contain one date,
                  but wildcard expressions can expand 
                 into multiple possible dates.
+        :raises ExpansionLimitError: If the expression describes
+                                     more than `max_dates` dates.
         """
         # If the expression contains a wildcard (*), 
         # treat it as an expression date that needs expansion.
         if "*" in expr:
-            return cls.parse_expr_date(expr)
+            return cls.parse_expr_date(expr, max_dates)
 
         # Otherwise, parse it as a constant (exact) date.
-        return (cls.parse_var_date(expr),)
+        return (cls.parse_var_date(expr, tz),)
 
     @classmethod
-    def parse_expr_date(cls, expr: str) -> tuple[date, ...]:
+    def parse_expr_date(
+        cls, expr: str, max_dates: int | None = None
+    ) -> tuple[date, ...]:
         """
         Parse a date expression containing wildcard characters (*). 
         The wildcard can appear in different parts of the date 
@@ -113,120 +336,106 @@ class ExpressDateParser:
 
         :param expr: A string representing a date expression 
                      with one or more '*' characters.
+        :param max_dates: An optional maximum number of dates to generate.
         :return: A tuple of date objects that match the wildcard expression.
-        :raises ValueError: If the expression leads to 
-                            an invalid date (e.g., out of range).
+        :raises ValueError: If the expression does not follow the grammar.
+        :raises ExpansionLimitError: If the expression describes
+                                     more than `max_dates` dates.
         """
-        # Convert American format (MM-DD-YYYY) to 
-        # CJK format (YYYY-MM-DD) if needed.
-        expr = cls.convert_to_cjk_style(expr)
+        pattern = cls.parse_pattern(expr)
+        cls.check_limit(expr, pattern, max_dates)
+        if not metrics.enabled:
+            return tuple(pattern)
+        with metrics.timer(expr, "expand") as timer:
+            dates = tuple(pattern)
+            timer.count = len(dates)
+        return dates
+
+    @classmethod
+    def iter_expr_date(cls, expr: str) -> Iterator[date]:
+        """
+        Stream the dates of a date expression containing 
+        wildcard characters (*) in ascending order.
+
+        :param expr: A string representing a date expression 
+                     with one or more '*' characters.
+        :return: An iterator over the dates matching the wildcard expression.
+        :raises ValueError: If the expression does not follow the grammar.
+        """
+        return iter(cls.parse_pattern(expr))
+
+    @classmethod
+    def parse_pattern(cls, expr: str) -> DatePattern:
+        """
+        Parse a date expression containing wildcard characters (*)
+        into per-digit constraints without expanding it.
+
+        The expression may be written in either American (MM-DD-YYYY) or
+        CJK (YYYY-MM-DD) style and may be followed by a weekday filter
+        (e.g., "2024-**-**, mon").
 
-        # Initialize 'week' to None; it may be updated 
+        :param expr: A string representing a date expression 
+                     with one or more '*' characters.
+        :return: A DatePattern matching every valid date of the expression.
+        :raises ValueError: If the expression does not follow the grammar.
+        """
+        # Initialize 'weekday' to None; it may be updated 
         # if a weekday is specified (e.g., "mon", "tue").
-        week = None
+        weekday = None
 
         # Check if there's a comma indicating 
         # a weekday filter (e.g., "2023-01-01, mon").
         if (comma_pos := expr.find(",")) != -1:
-            expr, week = expr[:comma_pos], expr[comma_pos + 1:].strip().lower()
-
-        dates = []
-
-        # Search for asterisks (*) in the expression and handle them one by one.
-        i = -1
-        while (i := expr.find("*", i + 1)) != -1:
-            # Handle wildcard in the year portion (positions 0~3).
-            if 0 <= i < 3:
-                # Replace '*' with digits 0~9 to 
-                # generate all possible year values.
-                for digit in range(0, 10):
-                    dates.extend(cls.parse_date(expr.replace("*", str(digit), 1)))
-                break
-            if i == 3:
-                # If the wildcard is the last digit of the year (e.g., "202*"),
-                # replace it with digits 0~9. Skip "0000" year if it appears.
-                for digit in range(0 + (expr[:3] == "000"), 10):
-                    dates.extend(cls.parse_date(expr.replace("*", str(digit), 1)))
-                break
-
-            # By this point, the year is fully specified.
-            year = int(expr[:4])
-            # Check if it is a leap year.
-            is_leap = (year % 4 == 0 and year % 100 != 0) or (year % 400 == 0)
-
-            # Handle wildcard in the month portion (positions 5~6).
-            if i == 5:
-                # If the wildcard is the tens digit of the month, 
-                # it can be '0' or '1' in most cases.
-                is_zero = (expr[6] == "0")
-                for digit in range(0 + is_zero, 2):
-                    dates.extend(cls.parse_date(expr.replace("*", str(digit), 1)))
-                break
-            if i == 6:
-                # If the wildcard is the ones digit of the month 
-                # (e.g., "2023-0*-DD"),
-                # handle potential 10, 11, 12 if the tens digit is '1'.
-                is_over_ten = (expr[5] == "1")
-                for digit in range(1 - is_over_ten, 3 if is_over_ten else 10):
-                    dates.extend(cls.parse_date(expr.replace("*", str(digit), 1)))
-                break
-
-            # At this point, the month is fully specified.
-            month = int(expr[5:7])
-            is_feb = (month == 2)
-
-            # Handle wildcard in the day portion (positions 8~9).
-            if i == 8:
-                # If the wildcard is the tens digit of 
-                # the day (e.g., "2023-01-*1"),
-                # consider the possible range for the tens digit 
-                # (0~3 depending on month and leap year).
-                is_zero = (expr[9] == "0")
-                is_over_eight = (expr[9] not in "*0" and expr[9] > "8")
-                start = 0 + is_zero
-                # If the ones digit is over '8' and 
-                # it's a leap year in Feb, adjust the range.
-                end = 3 - (is_over_eight and is_leap) if is_feb else 4 - is_zero
-                for digit in range(start, end):
-                    dates.extend(cls.parse_date(expr.replace("*", str(digit), 1)))
-                break
-            if i == 9:
-                # If the wildcard is the ones digit of the day 
-                # (e.g., "2023-01-1*"),
-                # handle the maximum valid day based on the month.
-                days_in_month = [2, 9 + is_leap, 2, 1, 2, 1, 2, 2, 1, 2, 1, 2]
-                tens_digit = int(expr[8])
-                start = 0 + (tens_digit == 0)
-
-                if is_feb:
-                    # If it's February, check for 29 in 
-                    # leap years if tens_digit=2.
-                    end = 10 if tens_digit != 2 else days_in_month[1]
-                else:
-                    # For other months, if tens_digit=3, 
-                    # we handle 30 or 31 accordingly.
-                    end = 10 if tens_digit != 3 else days_in_month[month - 1]
-
-                for digit in range(start, end):
-                    dates.append(cls.parse_const_date(expr.replace("*", str(digit), 1)))
-                break
-
-        # If a weekday was specified, filter the generated dates accordingly.
-        if week:
-            weekday_map = {
-                "mon": 0,
-                "tue": 1,
-                "wed": 2,
-                "thu": 3,
-                "fri": 4,
-                "sat": 5,
-                "sun": 6,
-            }
-            weekday_val = weekday_map[week]
-            return tuple(d for d in dates if d.weekday() == weekday_val)
-
-        # Return the expanded dates if no weekday filtering is required.
-        return tuple(dates)
+            week = expr[comma_pos + 1:].strip().lower()
+            expr = expr[:comma_pos].strip()
+            if week not in WEEKDAYS:
+                raise ValueError("Invalid weekday.")
+            weekday = WEEKDAYS[week]
+
+        # Convert American format (MM-DD-YYYY) to 
+        # CJK format (YYYY-MM-DD) if needed.
+        expr = cls.convert_to_cjk_style(expr)
+        if len(expr) != 10 or expr[4] != "-" or expr[7] != "-":
+            raise ValueError("Invalid date expression.")
+
+        year = cls.parse_digits(expr[0:4])
+        month = cls.parse_digits(expr[5:7])
+        day = cls.parse_digits(expr[8:10])
+
+        # The tens digit of the month is limited to 0 or 1,
+        # and neither "00" nor months above "12" can be written.
+        if month[0] not in (None, 0, 1) or \
+                (month[0] == 0 and month[1] == 0) or \
+                (month[0] == 1 and month[1] not in (None, 0, 1, 2)):
+            raise ValueError("Invalid month expression.")
+
+        # The tens digit of the day is limited to 0~3,
+        # and neither "00" nor days above "31" can be written.
+        if day[0] not in (None, 0, 1, 2, 3) or \
+                (day[0] == 0 and day[1] == 0) or \
+                (day[0] == 3 and day[1] not in (None, 0, 1)):
+            raise ValueError("Invalid day expression.")
+
+        return DatePattern(year, month, day, weekday)
+
+    @staticmethod
+    def parse_digits(expr: str) -> tuple[int | None, ...]:
+        """
+        Parse a field of a wildcard expression into digit constraints.
+
+        :param expr: A string of digits and '*' characters.
+        :return: A tuple of digits, where None stands for a wildcard (*).
+        :raises ValueError: If the field contains any other character.
+        """
+        digits: list[int | None] = []
+        for char in expr:
+            if char == "*":
+                digits.append(None)
+            elif "0" <= char <= "9":
+                digits.append(ord(char) - 48)
+            else:
+                raise ValueError("Invalid date expression.")
+        return tuple(digits)
     
     @classmethod
     def parse_var_date(cls, expr: str, tz: tzinfo | None = None) -> date:
@@ -243,29 +452,39 @@ class ExpressDateParser:
                  constant date.
         :raises ValueError: If the expression is invalid or cannot be parsed.
         """
-        now = datetime.now(tz=tz).date()
-    
-        # Check for 'today' and return the current date.
+        term = cls.parse_var_term(expr)
+        if isinstance(term, int):
+            return clock.today(tz) + timedelta(days=term)
+        return term
+
+    @classmethod
+    def parse_var_term(cls, expr: str) -> date | int:
+        """
+        Parse a relative or constant date expression without resolving it.
+
+        Relative expressions ('today', 'yesterday', 'tomorrow', '+3', '-5')
+        are returned as an offset in days from today, 
+        anything else is parsed as a constant (exact) date.
+
+        :param expr: A string representing a relative or constant date.
+        :return: An offset in days, or a date object.
+        :raises ValueError: If the expression is invalid or cannot be parsed.
+        """
+        # Check for 'today', 'yesterday' and 'tomorrow'.
         if expr == "today":
-            return now
-    
-        # Check for 'yesterday' and return the date for one day before.
+            return 0
         elif expr == "yesterday":
-            return now - timedelta(days=1)
-    
-        # Check for 'tomorrow' and return the date for one day after.
+            return -1
         elif expr == "tomorrow":
-            return now + timedelta(days=1)
+            return 1
     
         # Handle expressions starting with '+' for future offsets.
         elif expr.startswith("+"):
-            num = int(expr[1:].strip())  # Extract the positive offset value.
-            return now + timedelta(days=num)
+            return int(expr[1:].strip())  # Extract the positive offset value.
     
         # Handle expressions starting with '-' for past offsets.
         elif expr.startswith("-"):
-            num = int(expr[1:].strip())  # Extract the negative offset value.
-            return now - timedelta(days=num)
+            return -int(expr[1:].strip())  # Extract the negative offset value.
     
         # Fall back to parsing the expression as an exact date.
         return cls.parse_const_date(expr)
@@ -284,6 +503,22 @@ class ExpressDateParser:
         :return: A date object corresponding to the expression.
         :raises ValueError: If the expression does not represent a valid date.
         """
+        # Fast path for the fixed YYYY-MM-DD and MM-DD-YYYY layouts,
+        # which skips strptime (its lock, regex and locale handling).
+        # The date constructor validates the calendar bounds, and
+        # only ASCII digits are accepted, like strptime.
+        if len(expr) == 10 and expr.isascii():
+            if expr[4] == "-" and expr[7] == "-":
+                year, month, day = expr[:4], expr[5:7], expr[8:]
+            elif expr[2] == "-" and expr[5] == "-":
+                month, day, year = expr[:2], expr[3:5], expr[6:]
+            else:
+                year = month = day = ""
+            if year.isdigit() and month.isdigit() and day.isdigit():
+                return date(int(year), int(month), int(day))
+
+        # Fall back to strptime for the looser layouts it accepts
+        # (e.g., "2024-8-5") and to report invalid expressions.
         return datetime.strptime(cls.convert_to_cjk_style(expr), "%Y-%m-%d").date()
 
     @staticmethod
@@ -0,0 +1,52 @@
+from __future__ import annotations
+from array import array
+
+__all__ = [
+    "MIN_YEAR", "MAX_YEAR", "DAYS_IN_MONTH", "DAYS_BEFORE_MONTH",
+    "DAYS_BEFORE_YEAR", "LEAP", "JAN1_WEEKDAY",
+]
+
+# The range of years supported by datetime.date.
+MIN_YEAR = 1
+MAX_YEAR = 9999
+
+# The number of days in each month, indexed by [leap][month - 1].
+DAYS_IN_MONTH = (
+    (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+    (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+)
+# The number of days before each month, indexed by [leap][month - 1].
+DAYS_BEFORE_MONTH = (
+    (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334),
+    (0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335),
+)
+
+
+def _build() -> tuple[array, bytes, bytes]:
+    """
+    Builds the per-year tables with a single pass over the supported years.
+
+    :return: The days before each year, the leap flags
+             and the weekday of January 1st, indexed by year.
+    """
+    # Index 0 is unused, so every table can be indexed by the year itself.
+    # The days before MAX_YEAR + 1 close the last year.
+    before = array("i", [0]) * (MAX_YEAR + 2)
+    leap = bytearray(MAX_YEAR + 1)
+    jan1 = bytearray(MAX_YEAR + 1)
+    days = 0
+    for year in range(MIN_YEAR, MAX_YEAR + 1):
+        is_leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+        before[year] = days
+        leap[year] = is_leap
+        # The ordinal 1 (0001-01-01) is a Monday.
+        jan1[year] = days % 7
+        days += 365 + is_leap
+    before[MAX_YEAR + 1] = days
+    return before, bytes(leap), bytes(jan1)
+
+
+# The ordinal of December 31st of the previous year, i.e. the number of
+# days before each year, the leap flag and the weekday (0 is Monday)
+# of January 1st of every year from MIN_YEAR to MAX_YEAR.
+DAYS_BEFORE_YEAR, LEAP, JAN1_WEEKDAY = _build()
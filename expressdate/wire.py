@@ -0,0 +1,150 @@
+from __future__ import annotations
+from .dateset import DatePattern, DateRuns, DateSet
+from .tables import DAYS_BEFORE_YEAR
+
+__all__ = ["VERSION", "encode", "decode"]
+
+# Every encoded value starts with these bytes, followed by the version.
+MAGIC = b"XD"
+VERSION = 1
+
+# The kinds of encoded date sets.
+KIND_RUNS = 0
+KIND_PATTERN = 1
+
+# The byte standing for a wildcard digit or a missing weekday.
+WILDCARD = 0xFF
+
+# One past the ordinal of 9999-12-31.
+MAX_STOP = DAYS_BEFORE_YEAR[-1] + 1
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    """
+    Appends an unsigned integer in LEB128 form (7 bits per byte).
+
+    :param out: The buffer to append to.
+    :param value: A non-negative integer.
+    """
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    """
+    Reads an unsigned integer in LEB128 form.
+
+    :param data: The encoded bytes.
+    :param pos: The position of the integer.
+    :return: The integer and the position after it.
+    :raises ValueError: If the data is truncated.
+    """
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Invalid ExpressDate data.")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode(date_set: DateSet, expr: str | None = None) -> bytes:
+    """
+    Encodes a date set, and optionally its expression, compactly.
+
+    Patterns are encoded by their digits, so they stay lazy once decoded.
+    Any other set is encoded by its runs, each as the gap since the
+    previous run and its length, so a range of any size takes a few bytes.
+
+    :param date_set: The date set to encode.
+    :param expr: An optional expression describing the dates.
+    :return: The encoded bytes, starting with a version header.
+    """
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    if expr is None:
+        _write_varint(out, 0)
+    else:
+        text = expr.encode("utf-8")
+        # The length is shifted so that 0 stands for a missing expression.
+        _write_varint(out, len(text) + 1)
+        out += text
+
+    if isinstance(date_set, DatePattern):
+        out.append(KIND_PATTERN)
+        year, month, day, weekday = date_set.digits
+        out += bytes(WILDCARD if d is None else d for d in (*year, *month, *day))
+        out.append(WILDCARD if weekday is None else weekday)
+        return bytes(out)
+
+    out.append(KIND_RUNS)
+    runs = tuple(date_set.runs())
+    _write_varint(out, len(runs))
+    previous = 0
+    for start, stop in runs:
+        _write_varint(out, start - previous)
+        _write_varint(out, stop - start)
+        previous = stop
+    return bytes(out)
+
+
+def decode(data: bytes) -> tuple[DateSet, str | None]:
+    """
+    Decodes a date set encoded by `encode`,
+    without parsing any expression or reading the clock.
+
+    :param data: The encoded bytes.
+    :return: The date set and its expression, if one was encoded.
+    :raises ValueError: If the data is invalid or of an unsupported version.
+    """
+    data = bytes(data)
+    if data[:2] != MAGIC or len(data) < 4:
+        raise ValueError("Invalid ExpressDate data.")
+    if data[2] != VERSION:
+        raise ValueError(f"Unsupported ExpressDate data version {data[2]}.")
+
+    length, pos = _read_varint(data, 3)
+    expr = None
+    if length:
+        end = pos + length - 1
+        if end > len(data):
+            raise ValueError("Invalid ExpressDate data.")
+        expr = data[pos:end].decode("utf-8")
+        pos = end
+    if pos >= len(data):
+        raise ValueError("Invalid ExpressDate data.")
+    kind = data[pos]
+    pos += 1
+
+    if kind == KIND_PATTERN:
+        if len(data) != pos + 9:
+            raise ValueError("Invalid ExpressDate data.")
+        digits = tuple(None if d == WILDCARD else d for d in data[pos:pos + 9])
+        weekday = digits[8]
+        if any(d is not None and d > 9 for d in digits) or \
+                (weekday is not None and weekday > 6):
+            raise ValueError("Invalid ExpressDate data.")
+        return DatePattern(digits[0:4], digits[4:6], digits[6:8], weekday), expr
+
+    if kind != KIND_RUNS:
+        raise ValueError("Invalid ExpressDate data.")
+    count, pos = _read_varint(data, pos)
+    runs: list[tuple[int, int]] = []
+    previous = 0
+    for _ in range(count):
+        gap, pos = _read_varint(data, pos)
+        length, pos = _read_varint(data, pos)
+        start = previous + gap
+        previous = start + length
+        # Runs are non-empty, non-adjacent and within the supported dates.
+        if length == 0 or (gap == 0 and runs) or start < 1 or previous > MAX_STOP:
+            raise ValueError("Invalid ExpressDate data.")
+        runs.append((start, previous))
+    if pos != len(data):
+        raise ValueError("Invalid ExpressDate data.")
+    return DateRuns(tuple(runs)), expr
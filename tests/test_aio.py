@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from datetime import date
+from expressdate import ExpansionLimitError, ExpressDateParser
+from expressdate.aio import aexpr, aiter_dates, aparse, aparse_many
+from expressdate.clock import frozen
+
+
+def test_aexpr():
+    async def main():
+        small = await aexpr("2024-08-1*")
+        large = await aexpr("20**-**-**", threshold=1000)
+        span = await aexpr("1900-01-01 ~ 2099-12-31", threshold=1000)
+        return small, large, span
+
+    small, large, span = asyncio.run(main())
+    assert small._dates is None
+    assert small.dates == ExpressDateParser.parse("2024-08-1*")
+    # The dates of large expressions are built off the event loop.
+    assert large._dates is not None and span._dates is not None
+    assert large.dates == ExpressDateParser.parse("20**-**-**")
+    assert len(span.dates) == 73049
+
+
+def test_aparse():
+    async def main():
+        return (
+            await aparse("2024-08-1*"),
+            await aparse("2000-01-01 ~ 2009-12-31", threshold=10),
+        )
+
+    small, large = asyncio.run(main())
+    assert small == ExpressDateParser.parse("2024-08-1*")
+    assert large == ExpressDateParser.parse("2000-01-01 ~ 2009-12-31")
+    with pytest.raises(ExpansionLimitError):
+        asyncio.run(aparse("****-**-**", max_dates=10))
+
+
+def test_aparse_many():
+    exprs = ["2024-08-1*", "today", "20**-**-**, mon", "2024-08-1*"]
+
+    async def main():
+        with frozen(date(2024, 8, 15)):
+            return await aparse_many(exprs, concurrency=2, threshold=100)
+
+    assert asyncio.run(main()) == [
+        ExpressDateParser.parse("2024-08-1*"),
+        (date(2024, 8, 15),),
+        ExpressDateParser.parse("20**-**-**, mon"),
+        ExpressDateParser.parse("2024-08-1*"),
+    ]
+    with pytest.raises(ValueError):
+        asyncio.run(aparse_many(exprs, concurrency=0))
+
+
+def test_aiter_dates():
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0)
+
+    async def main():
+        task = asyncio.create_task(ticker())
+        dates = [d async for d in aiter_dates("2024-**-**", chunk_size=10)]
+        task.cancel()
+        return dates
+
+    dates = asyncio.run(main())
+    assert tuple(dates) == ExpressDateParser.parse("2024-**-**")
+    # Other tasks ran while the dates were streamed.
+    assert len(ticks) > 30
+
+    async def invalid():
+        async for _ in aiter_dates("2024-**-**", chunk_size=0):
+            pass
+
+    with pytest.raises(ValueError):
+        asyncio.run(invalid())
@@ -0,0 +1,34 @@
+import json
+from expressdate.bench import CASES, main, run
+
+
+def test_cases():
+    # Every case runs without raising.
+    names = [case.name for case in CASES]
+    assert len(names) == len(set(names))
+    for case in CASES:
+        if "****" not in case.name:
+            case.func()
+
+
+def test_run():
+    cases = [case for case in CASES if case.name == "contains/range"]
+    report = run(cases, repeat=2, profile_slowest=1)
+    assert report["meta"]["python"]
+    (result,) = report["results"]
+    assert result["name"] == "contains/range"
+    assert result["repeat"] == 2
+    assert 0 < result["best"] <= result["mean"]
+    assert result["profile"]
+    json.dumps(report)
+
+
+def test_main(tmp_path, capsys):
+    assert main(["--list", "--filter", "setops/"]) == 0
+    assert "setops/union_decades" in capsys.readouterr().out
+    assert main(["--filter", "no such case"]) == 1
+    output = tmp_path / "bench.json"
+    assert main(["--filter", "single/parse_const_date", "--repeat", "1",
+                 "--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert [r["name"] for r in report["results"]] == ["single/parse_const_date"]
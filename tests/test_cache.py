@@ -0,0 +1,63 @@
+import pytest
+from threading import Thread
+from expressdate.cache import LRUCache
+
+
+def test_get_put():
+    cache = LRUCache(maxsize=2)
+    assert cache.get("a") is None
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("b", 2) == 2
+    info = cache.info()
+    assert (info.hits, info.misses, info.maxsize, info.currsize) == (1, 2, 2, 1)
+
+
+def test_eviction():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    # Touch "a" so "b" becomes the least recently used entry.
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    # Shrinking evicts the least recently used entries.
+    cache.resize(1)
+    assert len(cache) == 1
+    assert cache.get("c") == 3
+    # A cache without room stores nothing.
+    cache.resize(0)
+    cache.put("d", 4)
+    assert len(cache) == 0
+    with pytest.raises(ValueError):
+        cache.resize(-1)
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=-1)
+
+
+def test_clear():
+    cache = LRUCache()
+    cache.put("a", 1)
+    cache.get("a")
+    cache.clear()
+    assert cache.info() == (0, 0, 1024, 0)
+
+
+def test_thread_safety():
+    cache = LRUCache(maxsize=64)
+
+    def work(offset: int):
+        for i in range(1000):
+            cache.put((offset + i) % 100, i)
+            cache.get((offset + i) % 100)
+
+    threads = [Thread(target=work, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    info = cache.info()
+    assert info.currsize == 64
+    assert info.hits + info.misses == 8000
@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+from threading import Thread
+from zoneinfo import ZoneInfo
+from expressdate import ExpressDate, ExpressDateParser
+from expressdate.clock import frozen, today
+
+
+def test_frozen():
+    with frozen(date(2024, 8, 15)) as pinned:
+        assert pinned == date(2024, 8, 15)
+        assert today() == date(2024, 8, 15)
+        assert ExpressDateParser.parse("-2 ~ today") == (
+            date(2024, 8, 13), date(2024, 8, 14), date(2024, 8, 15)
+        )
+        assert ExpressDateParser.parse_var_date("tomorrow") == date(2024, 8, 16)
+        assert ExpressDateParser.parse_date("yesterday") == (date(2024, 8, 14),)
+        assert ExpressDateParser.parse_many(["today", "+1"]) == \
+               [(date(2024, 8, 15),), (date(2024, 8, 16),)]
+        assert ExpressDate("2024-08-10 ~").last == date(2024, 8, 15)
+        # Blocks may be nested.
+        with frozen(date(2000, 1, 1)):
+            assert ExpressDate("today").first == date(2000, 1, 1)
+        assert ExpressDate("today").first == date(2024, 8, 15)
+    assert today() != date(2024, 8, 15) or date.today() == date(2024, 8, 15)
+
+
+def test_frozen_clock_read_once():
+    with frozen(tz=ZoneInfo("Pacific/Kiritimati")) as pinned:
+        assert today() == pinned
+        assert today(ZoneInfo("Pacific/Pago_Pago")) == pinned
+
+
+def test_frozen_per_thread():
+    results = []
+
+    def worker():
+        results.append(today())
+
+    with frozen(date(2024, 8, 15)):
+        thread = Thread(target=worker)
+        thread.start()
+        thread.join()
+    # Other threads do not see the pinned date.
+    assert results[0] != date(2024, 8, 15) or date.today() == date(2024, 8, 15)
+
+
+def test_tz():
+    east = ZoneInfo("Pacific/Kiritimati")  # UTC+14
+    west = ZoneInfo("Pacific/Honolulu")  # UTC-10
+    # The two timezones are exactly a day apart.
+    assert ExpressDate("today", tz=east).first - \
+           ExpressDate("today", tz=west).first == timedelta(days=1)
+    assert ExpressDateParser.parse_date("today", tz=east)[0] - \
+           ExpressDateParser.parse_date("today", tz=west)[0] == timedelta(days=1)
+    # Operands are parsed in the timezone of the instance.
+    d = ExpressDate("today", tz=east)
+    assert d.tz is east
+    assert d == "today"
+    assert len(d.union("-1 ~ today")) == 2
+    assert len(d.intersection("today ~ +1")) == 1
+    assert d.union("2024-08-15").tz is east
+    assert d.union("2024-08-15").difference("today") == "2024-08-15"
+    assert len("today" @ d) == 1
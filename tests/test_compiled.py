@@ -0,0 +1,77 @@
+import pytest
+from datetime import date
+from expressdate.compiled import CompiledExpr
+from expressdate.parse import ExpressDateParser
+
+
+def test_evaluate():
+    # Absolute expressions are resolved once.
+    compiled = ExpressDateParser.compile("2024-08-10 ~ 2024-08-15", cache=False)
+    assert compiled.is_relative is False
+    assert compiled.evaluate() is compiled.evaluate()
+    assert len(compiled.evaluate()) == 6
+    # Relative expressions are resolved on every evaluation.
+    compiled = ExpressDateParser.compile("-3 ~ today", cache=False)
+    assert compiled.is_relative is True
+    result = compiled.evaluate(today=date(2024, 8, 15))
+    assert result.first == date(2024, 8, 12)
+    assert result.last == date(2024, 8, 15)
+    result = compiled.evaluate(today=date(2024, 9, 1))
+    assert result.first == date(2024, 8, 29)
+    # A range ending at 'today' is resolved by the clock.
+    compiled = ExpressDateParser.compile("2024-08-15 ~", cache=False)
+    assert compiled.evaluate(today=date(2024, 8, 16)).last == date(2024, 8, 16)
+    with pytest.raises(ValueError):
+        compiled.evaluate(today=date(2024, 8, 14))
+
+
+def test_repr():
+    compiled = ExpressDateParser.compile("2024-08-1*", cache=False)
+    assert repr(compiled) == "CompiledExpr('2024-08-1*')"
+    assert compiled.expr == "2024-08-1*"
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        CompiledExpr("2024-08-15")
+    with pytest.raises(ValueError):
+        CompiledExpr("", left=date(2024, 8, 15), right=date(2024, 8, 14))
+
+
+def test_pattern_terms():
+    compiled = ExpressDateParser.compile("2024-08-1*, mon", cache=False)
+    assert compiled.pattern is not None and compiled.terms is None
+    assert compiled.pattern.digits[3] == 0
+    compiled = ExpressDateParser.compile("2024-08-10 ~ +3", cache=False)
+    assert compiled.pattern is None
+    assert compiled.terms == (date(2024, 8, 10), 3)
+
+
+def test_matches():
+    compiled = ExpressDateParser.compile("****-**-1*, fri", cache=False)
+    assert compiled.matches(date(2024, 8, 16)) is True
+    assert compiled.matches(date(2024, 8, 15)) is False
+    assert compiled.matches(date(1, 1, 1)) is False
+    assert compiled.matches("2024-08-16") is False
+    compiled = ExpressDateParser.compile("-3 ~ today", cache=False)
+    assert compiled.matches(date(2024, 8, 12), today=date(2024, 8, 15)) is True
+    assert compiled.matches(date(2024, 8, 11), today=date(2024, 8, 15)) is False
+    # A relative range in the wrong order is rejected like by `evaluate`.
+    compiled = ExpressDateParser.compile("+3 ~ today", cache=False)
+    with pytest.raises(ValueError):
+        compiled.matches(date(2024, 8, 15), today=date(2024, 8, 15))
+    compiled = ExpressDateParser.compile("2024-08-10 ~ 2024-08-15", cache=False)
+    assert compiled.matches(date(2024, 8, 15)) is True
+    assert compiled.matches(date(2024, 8, 16)) is False
+
+
+def test_filter():
+    compiled = ExpressDateParser.compile("-1 ~ +1", cache=False)
+    values = (date(2024, 8, d) for d in range(1, 32))
+    result = compiled.filter(values, today=date(2024, 8, 15))
+    assert next(result) == date(2024, 8, 14)
+    assert tuple(result) == (date(2024, 8, 15), date(2024, 8, 16))
+    with pytest.raises(ValueError):
+        ExpressDateParser.compile("2024-08-15 ~", cache=False).filter(
+            (), today=date(2024, 8, 14)
+        )
@@ -1,6 +1,7 @@
 import pytest
 from datetime import date, timedelta
 from expressdate.date import ExpressDate
+from expressdate.parse import ExpressDateParser
 
 
 def test_init():
@@ -20,6 +21,10 @@ def test_init():
         date(2024, 8, 18),
         date(2024, 8, 19)
     )
+    # Initialize with compiled expression
+    d = ExpressDate(ExpressDateParser.compile("2024-08-1*"))
+    assert len(d) == 10
+    assert str(d) == "2024-08-1*"
     # Initialize with date
     d = ExpressDate(date(2024, 8, 15))
     assert d.first == date(2024, 8, 15)
@@ -29,10 +34,97 @@ def test_init():
         ExpressDate(20240815)  # pyright: ignore [reportArgumentType]
 
 
+def test_lazy():
+    d = ExpressDate("2000-01-01 ~ 2099-12-31")
+    assert d.first == date(2000, 1, 1)
+    assert d.last == date(2099, 12, 31)
+    assert len(d) == 36525
+    assert d.is_continuous is True
+    d = ExpressDate("****-**-**")
+    assert d.first == date(1, 1, 1)
+    assert d.last == date(9999, 12, 31)
+
+
+def test_max_dates():
+    from expressdate import ExpansionLimitError, express
+    assert len(ExpressDate("2024-08-1*", max_dates=10)) == 10
+    with pytest.raises(ExpansionLimitError):
+        ExpressDate("****-**-**", max_dates=1000)
+    with pytest.raises(ExpansionLimitError):
+        express("2024-01-01 ~ 2024-12-31", max_dates=365)
+
+
+def test_getitem():
+    d = ExpressDate("2024-08-1*")
+    assert d[0] == date(2024, 8, 10)
+    assert d[-1] == date(2024, 8, 19)
+    assert d[2:5] == (date(2024, 8, 12), date(2024, 8, 13), date(2024, 8, 14))
+    assert d[::-4] == (date(2024, 8, 19), date(2024, 8, 15), date(2024, 8, 11))
+    assert d[::3] == d.dates[::3]
+    assert d.index(date(2024, 8, 13)) == 3
+    assert d.index("2024-08-19") == 9
+    for index in (10, -11):
+        with pytest.raises(IndexError):
+            d[index]
+    with pytest.raises(ValueError):
+        d.index("2024-08-20")
+    assert d.index(ExpressDate("2024-08-11")) == 1
+    # Like `in`, only a single-day ExpressDate can be located.
+    with pytest.raises(ValueError):
+        d.index(ExpressDate("2024-08-1*"))
+    with pytest.raises(TypeError):
+        d["0"]  # pyright: ignore [reportArgumentType]
+    # Pagination over a large schedule without expanding it.
+    d = ExpressDate("****-**-**, mon")
+    assert d[10000] == date(192, 8, 27)
+    assert d.index(d[10000]) == 10000
+    assert d[-1] == date(9999, 12, 27)
+    d = ExpressDate("2024-01-01 ~ 2024-01-03").union("2024-02-01")
+    assert d[3] == date(2024, 2, 1)
+    assert d.index(date(2024, 2, 1)) == 3
+
+
+class CustomDate(ExpressDate):
+    pass
+
+
+def test_bytes():
+    import pickle
+    from expressdate.clock import frozen
+    d = ExpressDate("2014-01-01 ~ 2023-12-31")
+    data = d.to_bytes()
+    assert len(data) < 40
+    restored = ExpressDate.from_bytes(data)
+    assert restored == d and str(restored) == str(d)
+    # Relative expressions keep their dates and are not evaluated again.
+    with frozen(date(2024, 8, 15)):
+        data = ExpressDate("-2 ~ today").to_bytes()
+    restored = ExpressDate.from_bytes(data)
+    assert restored.first == date(2024, 8, 13)
+    assert str(restored) == "-2 ~ today"
+    # Patterns stay lazy, and pickling goes through the same encoding.
+    for d in (ExpressDate("****-**-**, mon"),
+              ExpressDate("2024-08-1*").union("2024-09-01")):
+        restored = pickle.loads(pickle.dumps(d))
+        assert restored == d and str(restored) == str(d)
+        assert len(pickle.dumps(d)) < 200
+    # Subclasses are restored as themselves.
+    restored = pickle.loads(pickle.dumps(CustomDate("2024-08-1*")))
+    assert type(restored) is CustomDate and restored == "2024-08-1*"
+
+
 def test_hash():
     d1 = ExpressDate("2024-08-15")
     d2 = ExpressDate(date(2024, 8, 15))
     assert hash(d1) == hash(d2)
+    # Equal dates hash alike whatever their representation.
+    d1 = ExpressDate("****-**-**")
+    d2 = ExpressDate("0001-01-01 ~ 9999-12-31")
+    assert hash(d1) == hash(d2)
+    assert d1 == d2
+    assert {d1: 1}[d2] == 1
+    d1 = ExpressDate("2024-08-15 ~ 2024-08-19")
+    assert hash(d1.difference("2024-08-17")) == hash(d1.difference("2024-08-16"))
 
 
 def test_str():
@@ -45,6 +137,21 @@ def test_repr():
     expr = "2024-08-15"
     d = ExpressDate(expr)
     assert repr(d) == f"ExpressDate('{expr}')"
+    # Long descriptions of set operation results are shortened.
+    d = ExpressDate("2024-**-**, mon").union("2024-08-1*")
+    assert len(repr(d)) == len("ExpressDate('')") + 80
+    assert repr(d).endswith("...')")
+
+
+def test_str_is_cached_apart():
+    d = ExpressDate("2024-08-10").union("2024-08-12")
+    size = len(d.to_bytes())
+    assert d.is_const is False
+    assert str(d) == "08-10-2024 | 08-12-2024"
+    # Describing the result changes neither its behaviour nor its encoding.
+    assert d.is_const is False
+    assert len(d.to_bytes()) == size
+    assert str(ExpressDate.from_bytes(d.to_bytes())) == str(d)
 
 
 def test_add():
@@ -214,6 +321,14 @@ def test_ne():
     d1 = ExpressDate("2024-08-2*")
     d2 = "2024-08-10 ~ 2024-08-19"
     assert d1 != d2
+    # Equal hashes are not enough to be equal.
+    d1 = ExpressDate("2024-08-15 ~ 2024-08-19")
+    assert d1.difference("2024-08-17") != d1.difference("2024-08-16")
+    d1 = ExpressDate("2024-0*-01")
+    assert d1 != d1.difference("2024-05-01").union("2024-05-02")
+    assert d1 == d1.difference("2024-05-01").union("2024-05-01")
+    assert ExpressDate("2024-*3-0*") == ExpressDate("2024-03-01 ~ 2024-03-09")
+    assert ExpressDate("2024-*3-0*") == ExpressDate("2024-03-0*")
 
 
 def test_or():
@@ -469,6 +584,36 @@ def test_rxor():
     )
 
 
+def test_set_methods():
+    d1 = ExpressDate("2024-08-10 ~ 2024-08-16")
+    d2 = ExpressDate("2024-08-14 ~ 2024-08-19")
+    result = d1.union(d2)
+    assert isinstance(result, ExpressDate)
+    assert result == "2024-08-1*"
+    assert str(result) == "08-10-2024 ~ 08-19-2024"
+    result = d1.intersection("2024-08-14 ~ 2024-08-19")
+    assert result.dates == (
+        date(2024, 8, 14),
+        date(2024, 8, 15),
+        date(2024, 8, 16),
+    )
+    result = d1.difference(d2)
+    assert str(result) == "08-10-2024 ~ 08-13-2024"
+    result = d1.symmetric_difference(d2)
+    assert repr(result) == \
+        "ExpressDate('08-10-2024 ~ 08-13-2024 | 08-17-2024 ~ 08-19-2024')"
+    assert result.is_const is False
+    # Large ranges are never expanded.
+    d1 = ExpressDate("2000-01-01 ~ 2099-12-31")
+    d2 = ExpressDate("1950-01-01 ~ 2049-12-31")
+    result = d1.intersection(d2)
+    assert len(result) == 18263
+    assert result.first == date(2000, 1, 1)
+    assert result.last == date(2049, 12, 31)
+    with pytest.raises(TypeError):
+        d1.union(20240815)  # pyright: ignore [reportArgumentType]
+
+
 def test_date_contains():
     # Check ExpressDate contains ExpressDate
     d1 = ExpressDate("2024-08-15")
@@ -561,6 +706,18 @@ def test_rmatmul():
         assert d2 @ d1 is not None
         
         
+def test_to_numpy():
+    np = pytest.importorskip("numpy")
+    for expr in ("2024-08-1*", "2024-**-**, mon", "19**-**-10",
+                 "2000-01-01 ~ 2009-12-31"):
+        d = ExpressDate(expr)
+        result = d.to_numpy()
+        assert result.dtype == np.dtype("datetime64[D]")
+        assert result.tolist() == list(d.dates)
+    result = ExpressDate("2024-08-10 ~ 2024-08-16").union("2024-08-2*").to_numpy()
+    assert len(result) == 17
+
+
 def test_is_const():
     assert ExpressDate("2024-08-15").is_const is True
     assert ExpressDate("2024-08-1*").is_const is False
@@ -581,6 +738,46 @@ def test_length():
     assert ExpressDate("2024-**-**").length == 366
     
     
+def test_dates_storage():
+    d = ExpressDate("1950-01-01 ~ 2049-12-31")
+    # The tuple is built once and kept.
+    assert d.dates is d.dates and d.dates[5] == date(1950, 1, 6)
+    d = ExpressDate("2024-**-**, mon")
+    assert d.dates is d.dates and len(d.dates) == 53
+    # Only the tuple is kept, not an array of ordinals as well.
+    assert d._array is None
+    assert tuple(d) == d.dates
+    # Materialized ordinals are kept as 4-byte integers.
+    d = ExpressDate("2024-**-**, mon").materialize()
+    assert len(d._array.ordinals) == 53  # pyright: ignore [reportOptionalMemberAccess]
+    assert d._array.ordinals.itemsize == 4  # pyright: ignore
+    assert d.dates == tuple(d)
+
+
+def test_as_bitmap():
+    d = ExpressDate("20**-**-**, mon")
+    bitmap = d.as_bitmap()
+    assert str(bitmap) == str(d)
+    assert bitmap == d and hash(bitmap) == hash(d)
+    assert (bitmap & "20**-12-25") == (d & "20**-12-25")
+    assert bitmap.union("2024-08-1*").length == \
+           d.union("2024-08-1*").length
+    assert ExpressDate.from_bytes(bitmap.to_bytes()) == d
+
+
+def test_filter():
+    d = ExpressDate("****-**-**, mon")
+    values = (date(2024, 8, 1) + timedelta(days=i) for i in range(10 ** 6))
+    result = d.filter(values)
+    # The stream is consumed lazily and the expression is never expanded.
+    assert next(result) == date(2024, 8, 5)
+    assert next(result) == date(2024, 8, 12)
+    assert d._array is None
+    assert tuple(ExpressDate("2024-08-10 ~ 2024-08-12").filter(
+        [date(2024, 8, 12), "2024-08-11", date(2024, 8, 9), date(2024, 8, 10)]
+    )) == (date(2024, 8, 12), date(2024, 8, 10))
+
+
 def test_dates():
     assert ExpressDate("2024-08-1*").dates == (
         date(2024, 8, 10),
@@ -0,0 +1,272 @@
+import pytest
+from datetime import date
+from expressdate.dateset import (
+    DateArray, DateBitmap, DateRuns, DatePattern, DateSet
+)
+
+
+def test_date_runs():
+    # Single date
+    s = DateRuns.from_date(date(2024, 8, 15))
+    assert len(s) == 1
+    assert tuple(s) == (date(2024, 8, 15),)
+    # Date range
+    s = DateRuns.from_range(date(2024, 8, 15), date(2024, 8, 20))
+    assert len(s) == 6
+    assert s.first == date(2024, 8, 15)
+    assert s.last == date(2024, 8, 20)
+    assert s.is_continuous is True
+    assert tuple(s.runs()) == ((date(2024, 8, 15).toordinal(),
+                                date(2024, 8, 21).toordinal()),)
+    # Invalid order
+    with pytest.raises(ValueError):
+        DateRuns.from_range(date(2024, 8, 20), date(2024, 8, 15))
+    # Empty set
+    with pytest.raises(IndexError):
+        assert DateRuns(()).first is not None
+
+
+def test_date_set_abstract():
+    with pytest.raises(TypeError):
+        DateSet()
+
+
+def test_date_pattern():
+    # 2024-08-1*
+    s = DatePattern((2, 0, 2, 4), (0, 8), (1, None))
+    assert len(s) == 10
+    assert s.first == date(2024, 8, 10)
+    assert s.last == date(2024, 8, 19)
+    assert s.is_continuous is True
+    # 2024-08-*0
+    s = DatePattern((2, 0, 2, 4), (0, 8), (None, 0))
+    assert tuple(s) == (date(2024, 8, 10), date(2024, 8, 20), date(2024, 8, 30))
+    assert s.is_continuous is False
+    # ****-**-** is never expanded to answer boundaries.
+    s = DatePattern((None,) * 4, (None,) * 2, (None,) * 2)
+    assert s.first == date(1, 1, 1)
+    assert s.last == date(9999, 12, 31)
+    # 2024-**-**, mon
+    s = DatePattern((2, 0, 2, 4), (None,) * 2, (None,) * 2, 0)
+    assert len(s) == 53
+    assert s.first == date(2024, 1, 1)
+    assert s.last == date(2024, 12, 30)
+    assert all(d.weekday() == 0 for d in s)
+    # Runs are coalesced across months and years.
+    s = DatePattern((1, 9, 9, None), (1, 2), (3, None))
+    assert len(tuple(s.runs())) == 10
+    assert tuple(s.reversed_runs()) == tuple(reversed(tuple(s.runs())))
+
+
+def test_date_pattern_count():
+    # ****-**-**
+    s = DatePattern((None,) * 4, (None,) * 2, (None,) * 2)
+    assert len(s) == 3652059
+    assert s.is_continuous is True
+    # ****-**-**, mon
+    s = DatePattern((None,) * 4, (None,) * 2, (None,) * 2, 0)
+    assert len(s) == 521723
+    assert s.is_continuous is False
+    # ****-02-29 only matches leap years.
+    s = DatePattern((None,) * 4, (0, 2), (2, 9))
+    assert len(s) == 2424
+    # 19**-**-10 matches the brute-force expansion.
+    s = DatePattern((1, 9, None, None), (None,) * 2, (1, 0))
+    assert len(s) == len(tuple(s)) == 1200
+    s = DatePattern((2, 0, None, None), (None, 2), (None, 9), 4)
+    assert len(s) == len(tuple(s))
+
+
+def test_contains():
+    # Single range
+    s = DateRuns.from_range(date(2024, 8, 15), date(2024, 8, 20))
+    assert date(2024, 8, 15) in s
+    assert date(2024, 8, 20) in s
+    assert date(2024, 8, 21) not in s
+    assert "2024-08-15" not in s
+    # Multiple runs
+    s = DateRuns(((10, 20), (30, 40), (50, 51)))
+    result = [i for i in range(1, 60) if date.fromordinal(i) in s]
+    assert result == [*range(10, 20), *range(30, 40), 50]
+    # 20**-**-**, fri
+    s = DatePattern((2, 0, None, None), (None,) * 2, (None,) * 2, 4)
+    assert date(2024, 8, 16) in s
+    assert date(2024, 8, 15) not in s
+    assert date(1924, 8, 15) not in s
+    # 19**-**-10
+    s = DatePattern((1, 9, None, None), (None,) * 2, (1, 0))
+    assert all(d in s for d in s)
+    assert date(1900, 1, 11) not in s
+    assert date(2000, 1, 10) not in s
+
+
+def test_set_operations():
+    a = DatePattern((2, 0, 2, 4), (0, None), (1, None))
+    b = DatePattern((2, 0, 2, 4), (None, None), (None, 5), 2)
+    c = DateRuns.from_range(date(2024, 3, 1), date(2024, 6, 30))
+    for x, y in ((a, b), (a, c), (b, c), (c, a), (c, c)):
+        assert set(x.union(y)) == set(x) | set(y)
+        assert set(x.intersection(y)) == set(x) & set(y)
+        assert set(x.difference(y)) == set(x) - set(y)
+        assert set(x.symmetric_difference(y)) == set(x) ^ set(y)
+    # Two decade-long ranges are combined from their boundaries.
+    x = DateRuns.from_range(date(2000, 1, 1), date(2009, 12, 31))
+    y = DateRuns.from_range(date(2005, 1, 1), date(2014, 12, 31))
+    assert tuple(x.intersection(y).runs()) == (
+        (date(2005, 1, 1).toordinal(), date(2010, 1, 1).toordinal()),
+    )
+    assert len(x.union(y)) == len(x) + len(y) - len(x.intersection(y))
+    assert x.union(y).is_continuous is True
+    assert len(x.difference(x)) == 0
+    # Tuples of dates are coalesced into runs.
+    s = DateRuns.from_dates((date(2024, 8, 3), date(2024, 8, 1),
+                             date(2024, 8, 2), date(2024, 8, 2)))
+    assert len(tuple(s.runs())) == 1
+
+
+def test_date_array():
+    pattern = DatePattern((2, 0, 2, 4), (None,) * 2, (None, 5), 2)
+    s = DateArray.from_set(pattern)
+    assert s.ordinals.itemsize == 4
+    assert tuple(s) == tuple(pattern)
+    assert tuple(s.runs()) == tuple(pattern.runs())
+    assert tuple(s.reversed_runs()) == tuple(pattern.reversed_runs())
+    assert len(s) == len(pattern)
+    assert s.first == pattern.first
+    assert s.last == pattern.last
+    assert all(d in s for d in pattern)
+    assert date(2024, 1, 1) not in s
+    assert DateArray.from_set(s) is s
+    s = DateArray.from_dates((date(2024, 8, 3), date(2024, 8, 1), date(2024, 8, 3)))
+    assert tuple(s) == (date(2024, 8, 1), date(2024, 8, 3))
+    assert s.is_continuous is False
+    with pytest.raises(IndexError):
+        assert DateArray.from_dates(()).last is not None
+
+
+def test_date_pattern_segments():
+    # Whole months are coalesced into a single run.
+    s = DatePattern((2, 0, 2, 4), (0, None), (None,) * 2)
+    assert tuple(s.runs()) == (
+        (date(2024, 1, 1).toordinal(), date(2024, 10, 1).toordinal()),
+    )
+    assert tuple(s.reversed_runs()) == tuple(s.runs())
+    # Month lengths and leap years are derived arithmetically.
+    for year in (1900, 2000, 2023, 2024):
+        s = DatePattern(tuple(int(c) for c in str(year)), (None,) * 2, (2, None))
+        assert tuple(s) == tuple(DateArray.from_set(s))
+        assert s.last == date(year, 12, 29)
+        leap = year % 4 == 0 and year != 1900
+        # Only February 29 depends on the year.
+        assert len(s) == 12 * 10 - (not leap)
+
+
+def test_date_pattern_weekday():
+    # ****-**-**, sun
+    s = DatePattern((None,) * 4, (None,) * 2, (None,) * 2, 6)
+    assert s.first == date(1, 1, 7)
+    assert s.last == date(9999, 12, 26)
+    # 2024-0*-3*, wed
+    s = DatePattern((2, 0, 2, 4), (0, None), (3, None), 2)
+    assert tuple(s) == (date(2024, 1, 31), date(2024, 7, 31))
+    assert tuple(s.reversed_runs()) == tuple(reversed(tuple(s.runs())))
+
+
+def test_date_pattern_sparse_days():
+    # 19**-*2-*0, and the same with a weekday filter
+    for weekday in (None, 4):
+        s = DatePattern((1, 9, None, None), (None, 2), (None, 0), weekday)
+        expected = tuple(
+            date(year, month, day)
+            for year in range(1900, 2000) for month in (2, 12) for day in (10, 20, 30)
+            if (month, day) != (2, 30)
+            and (weekday is None or date(year, month, day).weekday() == weekday)
+        )
+        assert tuple(s) == expected
+        assert tuple(s._ordinals(reverse=True)) == \
+               tuple(d.toordinal() for d in reversed(expected))
+        assert s.first == expected[0] and s.last == expected[-1]
+
+
+def test_select_rank():
+    runs = DateRuns(((10, 13), (20, 22), (30, 31)))
+    pattern = DatePattern((2, 0, 2, None), (None, None), (0, 1), weekday=0)
+    for date_set in (runs, DateArray.from_set(runs), pattern,
+                     DateBitmap.from_set(runs), DateBitmap.from_set(pattern)):
+        ordinals = [d.toordinal() for d in date_set]
+        for i, ordinal in enumerate(ordinals):
+            assert date_set.select(i) == ordinal
+            assert date_set.rank(ordinal) == i
+            assert date_set.rank(ordinal + 1) == i + 1
+        assert date_set.rank(0) == 0
+        assert date_set.rank(10 ** 7) == len(ordinals)
+        with pytest.raises(IndexError):
+            date_set.select(len(ordinals))
+        with pytest.raises(IndexError):
+            date_set.select(-1)
+    # Random access does not expand the whole pattern.
+    pattern = DatePattern((None,) * 4, (None, None), (None, None))
+    assert pattern.select(10 ** 6) == 10 ** 6 + 1
+    mondays = DatePattern((None,) * 4, (None, None), (None, None), 0)
+    bitmap = DateBitmap.from_set(mondays)
+    assert bitmap.select(10 ** 5) == date(1917, 7, 16).toordinal()
+    assert bitmap.rank(date(1917, 7, 16).toordinal()) == 10 ** 5
+    assert pattern.rank(date(2024, 8, 15).toordinal()) == \
+           date(2024, 8, 15).toordinal() - 1
+
+
+def test_equals():
+    pattern = DatePattern((2, 0, 2, 4), (0, 8), (1, None))
+    runs = DateRuns.from_range(date(2024, 8, 10), date(2024, 8, 19))
+    assert pattern.equals(runs) and runs.equals(pattern)
+    assert pattern.equals(DateArray.from_set(runs))
+    # Patterns are compared by their normalized candidates.
+    assert DatePattern((2, 0, 2, 4), (None, 3), (1, 5)).equals(
+        DatePattern((2, 0, 2, 4), (0, 3), (1, 5))
+    )
+    assert not pattern.equals(DateRuns(tuple(pattern.runs())[:-1]))
+    assert DateRuns(()).equals(DateArray.from_dates(()))
+
+
+def test_date_bitmap():
+    pattern = DatePattern((1, 9, None, None), (None, None), (1, None), weekday=4)
+    runs = DateRuns.from_range(date(1999, 12, 25), date(2001, 1, 5))
+    for date_set in (pattern, runs, DateArray.from_set(pattern)):
+        bitmap = DateBitmap.from_set(date_set)
+        # Converting to bitmaps and back round-trips.
+        assert tuple(bitmap.runs()) == tuple(date_set.runs())
+        assert tuple(bitmap.reversed_runs()) == tuple(date_set.reversed_runs())
+        assert DateBitmap.from_set(DateRuns(tuple(bitmap.runs()))).key == bitmap.key
+        assert len(bitmap) == len(date_set)
+        assert bitmap.first == date_set.first and bitmap.last == date_set.last
+        assert bitmap.equals(date_set) and date_set.equals(bitmap)
+        for i in (0, len(date_set) // 2, len(date_set) - 1):
+            ordinal = date_set.select(i)
+            assert bitmap.select(i) == ordinal
+            assert bitmap.rank(ordinal) == i
+            assert date.fromordinal(ordinal) in bitmap
+    # Runs spanning a year boundary are split and joined again.
+    assert len(tuple(DateBitmap.from_set(runs).runs())) == 1
+    assert tuple(DateBitmap.from_dates(reversed(tuple(runs))).runs()) == \
+           tuple(runs.runs())
+    empty = DateBitmap({2024: 0})
+    assert len(empty) == 0 and tuple(empty.runs()) == ()
+    with pytest.raises(IndexError):
+        empty.first
+    with pytest.raises(IndexError):
+        DateBitmap.from_set(runs).select(len(runs))
+
+
+def test_date_bitmap_operations():
+    a = DatePattern((2, 0, None, None), (None, None), (None, None), weekday=0)
+    b = DatePattern((2, 0, 1, None), (None, 2), (1, None))
+    c = DateRuns.from_range(date(2015, 12, 30), date(2016, 1, 3))
+    for x, y in ((a, b), (b, c), (c, a), (a, a)):
+        bx, by = DateBitmap.from_set(x), DateBitmap.from_set(y)
+        for name in ("union", "intersection", "difference", "symmetric_difference"):
+            expected = tuple(getattr(x, name)(y).runs())
+            # Either operand may be a bitmap, and the result is then a bitmap.
+            for left, right in ((bx, by), (bx, y), (x, by)):
+                result = getattr(left, name)(right)
+                assert isinstance(result, DateBitmap)
+                assert tuple(result.runs()) == expected
@@ -0,0 +1,96 @@
+import pytest
+from datetime import date, timedelta
+from expressdate import ExpressDate, ExpressDateIndex
+from expressdate.clock import frozen
+
+
+def test_matching():
+    index = ExpressDateIndex({
+        "daily": "****-**-**",
+        "mondays": "****-**-**, mon",
+        "august": "2024-08-**",
+        "tens": "2024-**-1*",
+        "day": "2024-08-12",
+        "range": "2024-08-01 ~ 2024-08-20",
+        "week": "-3 ~ +3",
+        "since": "2024-08-10 ~",
+    })
+    assert len(index) == 8
+    today = date(2024, 8, 15)
+    assert sorted(index.matching(date(2024, 8, 12), today=today)) == [
+        "august", "daily", "day", "mondays", "range", "since", "tens", "week"
+    ]
+    assert sorted(index.matching(date(2024, 8, 13), today=today)) == [
+        "august", "daily", "range", "since", "tens", "week"
+    ]
+    assert sorted(index.matching(date(2023, 8, 13), today=today)) == ["daily"]
+    # Relative ranges follow 'today', including a pinned one.
+    assert "week" not in index.matching(date(2024, 8, 12), today=date(2024, 9, 1))
+    with frozen(date(2024, 8, 9)):
+        assert "since" not in index.matching(date(2024, 8, 12))
+        assert "week" in index.matching(date(2024, 8, 12))
+
+
+def test_add_remove():
+    index = ExpressDateIndex()
+    assert index.matching(date(2024, 8, 15)) == []
+    index.add("a", "2024-08-1*")
+    assert index.matching(date(2024, 8, 15)) == ["a"]
+    # Adding a key again replaces its expression.
+    index.add("a", "2024-09-1*")
+    assert index.matching(date(2024, 8, 15)) == []
+    assert "a" in index and index["a"].expr == "2024-09-1*"
+    index.remove("a")
+    assert "a" not in index and len(index) == 0
+    with pytest.raises(KeyError):
+        index.remove("a")
+    with pytest.raises(ValueError):
+        index.add("b", "2024-13-**")
+    with pytest.raises(ValueError):
+        index.add("b", "+3 ~ -3")
+
+
+def test_matching_many():
+    # The index agrees with membership tests against each expression.
+    exprs = {}
+    start = date(2023, 11, 20)
+    for i in range(300):
+        day = start + timedelta(days=i * 7 % 100)
+        text = day.isoformat()
+        if i % 3 == 0:
+            exprs[i] = text[:3] + "*" + text[4:8] + "*" + text[9:]
+        elif i % 3 == 1:
+            exprs[i] = f"{text} ~ {day + timedelta(days=i % 40)}"
+        else:
+            exprs[i] = f"{text[:8]}**, {('mon', 'fri', 'sun')[i % 5 % 3]}"
+    index = ExpressDateIndex(exprs)
+    dates = {key: ExpressDate(expr) for key, expr in exprs.items()}
+    for i in range(120):
+        value = start + timedelta(days=i)
+        assert sorted(index.matching(value)) == \
+               sorted(key for key, d in dates.items() if value in d)
+
+
+def test_matching_open_ranges():
+    # Ranges with one relative term, compared with membership tests.
+    exprs = {}
+    start = date(2024, 7, 1)
+    for i in range(120):
+        day = (start + timedelta(days=i * 11 % 90)).isoformat()
+        offset = ("today", "-3", "+5", "-10")[i % 4]
+        exprs[i] = f"{day} ~ {offset}" if i % 2 else f"{offset} ~ {day}"
+    exprs["open"] = "2024-08-01 ~"
+    index = ExpressDateIndex(exprs)
+    for today in (date(2024, 8, 1), date(2024, 8, 20), date(2024, 9, 15)):
+        dates = {}
+        with frozen(today):
+            for key, expr in exprs.items():
+                try:
+                    dates[key] = ExpressDate(expr)
+                except ValueError:
+                    # Ranges resolved in the wrong order match nothing.
+                    dates[key] = ()
+        for i in range(-20, 100):
+            value = date(2024, 7, 10) + timedelta(days=i)
+            assert sorted(map(str, index.matching(value, today=today))) == \
+                   sorted(str(key) for key, d in dates.items() if value in d)
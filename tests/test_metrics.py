@@ -0,0 +1,89 @@
+import pytest
+from expressdate.date import ExpressDate
+from expressdate.metrics import Event, Metrics, metrics
+from expressdate.parse import ExpressDateParser
+
+
+@pytest.fixture
+def enabled():
+    metrics.reset()
+    metrics.enable()
+    yield metrics
+    metrics.disable()
+    metrics.reset()
+
+
+def test_disabled():
+    metrics.reset()
+    ExpressDateParser.parse("2024-08-1*")
+    snapshot = metrics.snapshot()
+    assert snapshot["enabled"] is False
+    assert snapshot["dates"] == 0
+    assert snapshot["slowest"] == []
+
+
+def test_phases(enabled):
+    ExpressDateParser.compile("2024-08-1*", cache=False)
+    ExpressDateParser.parse("2024-08-1*")
+    ExpressDateParser.parse("-3 ~ today")
+    ExpressDate("2024-08-10 ~ 2024-08-15").union("2024-08-20").dates
+    snapshot = enabled.snapshot()
+    phases = snapshot["phases"]
+    assert phases["lex"]["calls"] >= 1
+    assert phases["resolve"]["calls"] == 1
+    assert phases["expand"]["calls"] == 3
+    assert phases["operate"]["calls"] == 1
+    assert phases["expand"]["seconds"] >= phases["expand"]["max"] > 0
+    assert snapshot["dates"] == 10 + 4 + 7
+    # The slowest events come first.
+    seconds = [event["seconds"] for event in snapshot["slowest"]]
+    assert seconds == sorted(seconds, reverse=True)
+
+
+def test_failed_phase(enabled):
+    with pytest.raises(ValueError):
+        ExpressDateParser.compile("2024-13-**", cache=False)
+    assert enabled.snapshot()["phases"]["lex"]["calls"] == 0
+
+
+def test_callback(enabled):
+    events = []
+    enabled.add_callback(events.append)
+    ExpressDateParser.parse_expr_date("2024-08-1*")
+    enabled.remove_callback(events.append)
+    ExpressDateParser.parse_expr_date("2024-08-1*")
+    assert len(events) == 1
+    assert isinstance(events[0], Event)
+    assert (events[0].expr, events[0].phase, events[0].dates) == \
+           ("2024-08-1*", "expand", 10)
+    with pytest.raises(ValueError):
+        enabled.remove_callback(events.append)
+
+
+def test_failing_callback(enabled, caplog):
+    def exporter(event):
+        raise RuntimeError("exporter down")
+
+    events = []
+    enabled.add_callback(exporter)
+    enabled.add_callback(events.append)
+    try:
+        # A failing callback neither breaks parsing nor the other callbacks.
+        assert len(ExpressDateParser.parse("2024-08-1*")) == 10
+        assert len(ExpressDate("2024-08-1*").union("2024-08-20")) == 11
+    finally:
+        enabled.remove_callback(exporter)
+        enabled.remove_callback(events.append)
+    assert len(events) == 2
+    assert "exporter down" in caplog.text
+
+
+def test_top():
+    local = Metrics(top=2)
+    for seconds in (0.3, 0.1, 0.2, 0.4):
+        local.record(Event("expr", "expand", seconds, None))
+    slowest = local.snapshot()["slowest"]
+    assert [event["seconds"] for event in slowest] == [0.4, 0.3]
+    assert local.snapshot()["phases"]["expand"]["calls"] == 4
+    with pytest.raises(ValueError):
+        Metrics(top=-1)
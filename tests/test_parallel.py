@@ -0,0 +1,53 @@
+import pickle
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta, timezone
+from expressdate.dateset import DateArray
+from expressdate.parallel import _partition, expand
+from expressdate.parse import ExpressDateParser
+
+
+def test_partition():
+    years = tuple(range(2000, 2011))
+    partitions = _partition(years, 4)
+    assert [len(p) for p in partitions] == [3, 3, 3, 2]
+    assert sum(partitions, ()) == years
+
+
+def test_expand_processes():
+    result = expand("20**-**-**, mon", workers=2)
+    assert isinstance(result, DateArray)
+    assert tuple(result) == ExpressDateParser.parse("20**-**-**, mon")
+
+
+def test_expand_threads():
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        assert tuple(expand("1***-02-29", workers=3, executor=pool)) == \
+               ExpressDateParser.parse("1***-02-29")
+
+
+def test_expand_small():
+    # Ranges and small patterns are expanded in the calling process.
+    assert tuple(expand("2024-08-1*")) == ExpressDateParser.parse("2024-08-1*")
+    assert tuple(expand("2024-08-10 ~ 2024-08-12", workers=4)) == (
+        date(2024, 8, 10), date(2024, 8, 11), date(2024, 8, 12)
+    )
+    assert tuple(expand("19**-12-25", workers=1)) == \
+           ExpressDateParser.parse("19**-12-25")
+    with pytest.raises(ValueError):
+        expand("2024-08-1*", workers=0)
+
+
+def test_expand_tz():
+    # Relative expressions resolve 'today' in the given timezone.
+    for tz in (timezone(timedelta(hours=14)), timezone(timedelta(hours=-12))):
+        assert tuple(expand("-1 ~ today", tz=tz)) == \
+               ExpressDateParser.parse("-1 ~ today", tz)
+
+
+def test_pickle_pattern():
+    pattern = ExpressDateParser.parse_pattern("2024-**-1*, fri")
+    len(pattern)
+    clone = pickle.loads(pickle.dumps(pattern))
+    assert clone.key == pattern.key
+    assert tuple(clone) == tuple(pattern)
@@ -16,6 +16,16 @@ def test_parse_const_date():
     # Test in american format
     result = ExpressDateParser.parse_const_date("08-15-2024")
     assert result == date(2024, 8, 15)
+    # Test looser layouts accepted by strptime
+    result = ExpressDateParser.parse_const_date("2024-8-5")
+    assert result == date(2024, 8, 5)
+    # Test invalid dates
+    for expr in ("2023-02-29", "0000-01-01", "2024-13-01", "2024-08-1 ",
+                 "2024/08/15", "+024-08-15", "2024-0_-15", "2024-08-15x",
+                 # Non-ASCII digits are rejected, like strptime does.
+                 "２０２４-０８-１５", "٢٠٢٤-٠٨-١٥"):
+        with pytest.raises(ValueError):
+            ExpressDateParser.parse_const_date(expr)
 
 
 def test_parse_expr_date():
@@ -67,6 +77,119 @@ def test_parse_expr_date():
     assert date(2024, 12, 31) not in result  # It is tuesday.
 
 
+def test_parse_expr_date_calendar():
+    # Patterns match every valid calendar date with the given digits.
+    # The original enumeration differed in these cases.
+    # The 30th is included (it was dropped, giving 24 dates).
+    result = ExpressDateParser.parse_expr_date("2024-**-*0")
+    assert len(result) == 35
+    assert date(2024, 4, 30) in result
+    # Feb 29 of a leap year is included (it was dropped).
+    assert ExpressDateParser.parse_expr_date("2024-02-*9") == (
+        date(2024, 2, 9), date(2024, 2, 19), date(2024, 2, 29)
+    )
+    assert ExpressDateParser.parse_expr_date("2023-02-*9") == (
+        date(2023, 2, 9), date(2023, 2, 19)
+    )
+    # Patterns without any valid date are empty (they used to raise).
+    assert ExpressDateParser.parse_expr_date("2023-02-3*") == ()
+    assert ExpressDateParser.parse_expr_date("****-02-3*") == ()
+    # Impossible intermediate candidates are skipped (they used to raise).
+    assert len(ExpressDateParser.parse_expr_date("2024-**-31")) == 7
+
+
+def test_parse_pattern():
+    # Both styles describe the same pattern.
+    result = ExpressDateParser.parse_pattern("2024-08-1*")
+    assert tuple(result) == tuple(ExpressDateParser.parse_pattern("08-1*-2024"))
+    # Only valid dates are matched.
+    result = ExpressDateParser.parse_pattern("2024-**-31")
+    assert len(result) == 7
+    result = ExpressDateParser.parse_pattern("08-2*-2024, Tue")
+    assert tuple(result) == (date(2024, 8, 20), date(2024, 8, 27))
+    # Invalid expressions
+    with pytest.raises(ValueError):
+        ExpressDateParser.parse_pattern("2024-2*-01")
+    with pytest.raises(ValueError):
+        ExpressDateParser.parse_pattern("2024-08-4*")
+    with pytest.raises(ValueError):
+        ExpressDateParser.parse_pattern("2024-08-1*, someday")
+    with pytest.raises(ValueError):
+        ExpressDateParser.parse_pattern("2024-0a-1*")
+
+
+def test_parse_set():
+    result = ExpressDateParser.parse_set("2000-01-01 ~ 2099-12-31")
+    assert len(result) == 36525
+    assert result.first == date(2000, 1, 1)
+    assert result.last == date(2099, 12, 31)
+    result = ExpressDateParser.parse_set("2024-08-15")
+    assert tuple(result) == (date(2024, 8, 15),)
+    with pytest.raises(ValueError):
+        ExpressDateParser.parse_set("~ 2024-08-15")
+
+
+def test_compile():
+    ExpressDateParser.cache.clear()
+    compiled = ExpressDateParser.compile("2024-**-**, mon")
+    assert ExpressDateParser.compile("2024-**-**, mon") is compiled
+    info = ExpressDateParser.cache.info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+    # Uncached compilation builds a new object.
+    assert ExpressDateParser.compile("2024-**-**, mon", cache=False) is not compiled
+    # Relative terms are kept as offsets.
+    compiled = ExpressDateParser.compile("yesterday ~ +3")
+    result = compiled.evaluate(today=date(2024, 8, 15))
+    assert result.first == date(2024, 8, 14)
+    assert result.last == date(2024, 8, 18)
+    # Invalid expressions are not cached.
+    with pytest.raises(ValueError):
+        ExpressDateParser.compile("2024-08-1* ~ 2024-08-2*")
+    with pytest.raises(ValueError):
+        ExpressDateParser.compile("2024-08-20 ~ 2024-08-15")
+    assert ExpressDateParser.cache.info().currsize == 2
+
+
+def test_iter_parse():
+    result = ExpressDateParser.iter_parse("****-**-**")
+    assert next(result) == date(1, 1, 1)
+    assert next(result) == date(1, 1, 2)
+    result = ExpressDateParser.iter_parse("2024-08-10 ~ 2024-08-12")
+    assert tuple(result) == (
+        date(2024, 8, 10),
+        date(2024, 8, 11),
+        date(2024, 8, 12),
+    )
+    result = ExpressDateParser.iter_expr_date("2024-**-**, mon")
+    assert next(result) == date(2024, 1, 1)
+    assert next(result) == date(2024, 1, 8)
+    result = ExpressDateParser.iter_date_range(date(2024, 8, 15), date(2024, 8, 16))
+    assert tuple(result) == (date(2024, 8, 15), date(2024, 8, 16))
+    # Invalid expressions are reported before iteration.
+    with pytest.raises(ValueError):
+        ExpressDateParser.iter_parse("2024-08-20 ~ 2024-08-15")
+    with pytest.raises(ValueError):
+        ExpressDateParser.iter_expr_date("2024-2*-01")
+    with pytest.raises(ValueError):
+        ExpressDateParser.iter_date_range(date(2024, 8, 16), date(2024, 8, 15))
+
+
+def test_parse_many():
+    exprs = ["2024-08-1*", "08-1*-2024", "2024-08-15", "2024-08-1*", "today ~"]
+    result = ExpressDateParser.parse_many(exprs)
+    assert result == [ExpressDateParser.parse(e) for e in exprs]
+    # Repeated and equivalent expressions share their expansion.
+    assert result[0] is result[1] is result[3]
+    assert ExpressDateParser.parse_many([]) == []
+    # Patterns with the same year and month digits share those fields.
+    a = ExpressDateParser.compile("****-02-29, mon", cache=False).pattern
+    b = ExpressDateParser.compile("****-02-*9, fri", cache=False).pattern
+    assert a._candidates()[0] is b._candidates()[0]
+    assert a._candidates()[1] is b._candidates()[1]
+    with pytest.raises(ValueError):
+        ExpressDateParser.parse_many(["2024-08-15", "2024-08-20 ~ 2024-08-15"])
+
+
 def test_parse_date_range():
     result = ExpressDateParser.parse_date_range(date(2024, 8, 15), date(2024, 8, 20))
     assert result == (
@@ -154,3 +277,33 @@ def test_parse():
         ExpressDateParser.parse("~ 2024-08-15")
     with pytest.raises(ValueError):
         ExpressDateParser.parse("Hello, World!")
+
+
+def test_estimate():
+    assert ExpressDateParser.estimate("2024-08-15") == 1
+    assert ExpressDateParser.estimate("2024-08-10 ~ 2024-08-19") == 10
+    assert ExpressDateParser.estimate("2024-02-**") == 29
+    assert ExpressDateParser.estimate("****-**-**") == 3652059
+    assert ExpressDateParser.estimate("-6 ~ today") == 7
+    with pytest.raises(ValueError):
+        ExpressDateParser.estimate("2024-13-**")
+
+
+def test_max_dates():
+    from expressdate import ExpansionLimitError
+    assert len(ExpressDateParser.parse("2024-08-1*", max_dates=10)) == 10
+    with pytest.raises(ExpansionLimitError) as info:
+        ExpressDateParser.parse("****-**-**", max_dates=1000)
+    assert (info.value.size, info.value.limit) == (3652059, 1000)
+    assert info.value.expr == "****-**-**"
+    # The error is also a ValueError.
+    with pytest.raises(ValueError):
+        ExpressDateParser.parse_expr_date("2024-**-**", max_dates=365)
+    with pytest.raises(ExpansionLimitError):
+        ExpressDateParser.parse_date("2024-**-**", max_dates=365)
+    with pytest.raises(ExpansionLimitError):
+        ExpressDateParser.parse_date_range(
+            date(2000, 1, 1), date(2024, 1, 1), max_dates=100
+        )
+    with pytest.raises(ExpansionLimitError):
+        ExpressDateParser.parse_many(["2024-08-15", "2024-**-**"], max_dates=10)
@@ -0,0 +1,24 @@
+from calendar import isleap, monthrange
+from datetime import date
+from expressdate import tables
+
+
+def test_year_tables():
+    for year in range(tables.MIN_YEAR, tables.MAX_YEAR + 1):
+        jan1 = date(year, 1, 1)
+        assert tables.DAYS_BEFORE_YEAR[year] == jan1.toordinal() - 1
+        assert tables.LEAP[year] == isleap(year)
+        assert tables.JAN1_WEEKDAY[year] == jan1.weekday()
+    assert tables.DAYS_BEFORE_YEAR[tables.MAX_YEAR + 1] == \
+           date(9999, 12, 31).toordinal()
+
+
+def test_month_tables():
+    for year in (1, 4, 100, 1900, 2000, 2023, 2024, 9999):
+        leap = tables.LEAP[year]
+        for month in range(1, 13):
+            assert tables.DAYS_BEFORE_YEAR[year] + \
+                   tables.DAYS_BEFORE_MONTH[leap][month - 1] + 1 == \
+                   date(year, month, 1).toordinal()
+            assert tables.DAYS_IN_MONTH[leap][month - 1] == \
+                   monthrange(year, month)[1]
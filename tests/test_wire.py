@@ -0,0 +1,39 @@
+import pytest
+from datetime import date
+from expressdate.dateset import DateArray, DatePattern, DateRuns
+from expressdate.wire import decode, encode
+
+
+def test_runs():
+    runs = DateRuns.from_range(date(2014, 1, 1), date(2023, 12, 31))
+    data = encode(runs)
+    # The header, the missing expression, the kind and a single run.
+    assert len(data) == 3 + 1 + 1 + 1 + 3 + 2
+    decoded, expr = decode(data)
+    assert expr is None
+    assert decoded.equals(runs)
+    # Sparse sets and empty sets are encoded by their runs too.
+    array = DateArray.from_dates([date(2024, 8, 15), date(2024, 8, 16), date(1, 1, 1)])
+    assert tuple(decode(encode(array, "sparse"))[0]) == tuple(array)
+    assert decode(encode(DateRuns(()), ""))[0].equals(DateRuns(()))
+    assert decode(encode(DateRuns(()), ""))[1] == ""
+
+
+def test_pattern():
+    pattern = DatePattern((2, 0, None, None), (None, None), (1, None), weekday=4)
+    decoded, expr = decode(encode(pattern, "20**-**-1*, fri"))
+    assert isinstance(decoded, DatePattern)
+    assert decoded.digits == pattern.digits
+    assert expr == "20**-**-1*, fri"
+
+
+def test_invalid():
+    data = encode(DateRuns.from_range(date(2024, 1, 1), date(2024, 1, 9)), "x")
+    for invalid in (b"", b"XD", b"AB\x01\x00\x00", data[:-1], data + b"\x00",
+                    b"XD\x01\x00\x07", b"XD\x01\x00\x01" + bytes(8),
+                    b"XD\x01\x00\x00\x01\x00\x01",
+                    b"XD\x01\x00\x00\x02\x01\x01\x00\x01"):
+        with pytest.raises(ValueError):
+            decode(invalid)
+    with pytest.raises(ValueError, match="version"):
+        decode(b"XD\x02" + data[3:])